@@ -1,3 +1,28 @@
+from .startup import startup_report  # first: times the imports below
+
+# isort: split
 from .config import settings
-from .database import Base, async_session, engine, get_session, init_db
-from .s3 import s3_client
+from .database import (
+    Base,
+    async_session,
+    engine,
+    get_pool_stats,
+    get_read_session,
+    get_session,
+    get_write_session,
+    init_db,
+    migrate_db,
+    replica_engine,
+)
+from .executor import (
+    regex_pool,
+    render_executor,
+    run_in_regex_pool,
+    run_in_render_pool,
+    run_in_s3_pool,
+    s3_executor,
+)
+from .metrics import MetricsMiddleware, registry
+from .s3 import get_s3_client
+
+startup_report.mark("core")
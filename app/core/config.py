@@ -1,5 +1,6 @@
 from functools import lru_cache
 from pathlib import Path
+from typing import Literal
 
 from pydantic import Field
 from pydantic_settings import BaseSettings
@@ -20,16 +21,63 @@ class Settings(BaseSettings):
     db_user: str = Field("user")
     db_password: str = Field("password")
     db_name: str = Field("editor")
+    db_url: str | None = Field(None)  # overrides the DSN above (e.g. local sqlite)
+    db_replica_url: str | None = Field(
+        None
+    )  # read replica DSN, None -> reads use the primary
+    # after a write the client reads from the primary for this long (read-your-writes)
+    db_read_your_writes_seconds: float = Field(5)
 
     # SQL Alchemy settings
     echo: bool = Field(False)
 
+    # DB connection pool settings (recycle below MySQL wait_timeout)
+    db_pool_size: int = Field(5)
+    db_max_overflow: int = Field(10)
+    db_pool_timeout: float = Field(30)
+    db_pool_recycle: int = Field(3600)
+    db_pool_pre_ping: bool = Field(True)
+
+    # Rendering settings (process pool, None -> number of CPUs)
+    render_workers: int | None = Field(None)
+    # docx engine: python-docx object tree / streamed WordprocessingML (per-request override)
+    docx_engine: Literal["python-docx", "stream"] = Field("python-docx")
+
+    # Export settings (documents rendered at once for a zip download)
+    export_concurrency: int = Field(4)
+    # Export jobs (jobs built at once, finished jobs kept for ttl seconds)
+    export_workers: int = Field(2)
+    export_job_ttl: int = Field(3600)
+
+    # Rendered docx cache (memory LRU, evicted files spill to the directory)
+    render_cache_memory_bytes: int = Field(64 * 1024 * 1024)
+    render_cache_disk_bytes: int = Field(1024 * 1024 * 1024)
+    render_cache_dir: Path = Field(BASE_DIR / ".cache" / "renders")
+
+    # Regex find and replace: wall time limit of the substitutions, seconds
+    # (they run in their own worker processes, killed when the limit passes)
+    replace_regex_timeout: float = Field(10)
+    replace_regex_workers: int = Field(2)
+
+    # Category listing stats (document counts / sizes) cache, seconds
+    category_stats_ttl: float = Field(30)
+
     # S3 Bucket settings
     s3_endpoint: str | None = Field(None)
     s3_access_key: str
     s3_secret_key: str
     s3_bucket: str = Field("editor")
     s3_region: str = Field("ap-northeast-2")
+    s3_workers: int = Field(8)  # threads for blocking boto3 calls
+
+    # Audio upload settings (multipart part size, S3 minimum is 5MB)
+    upload_part_size: int = Field(8 * 1024 * 1024)
+    upload_max_bytes: int = Field(2 * 1024 * 1024 * 1024 - 1)  # file_size is INT
+
+    # Presigned URL settings (cached url is re-signed after refresh_ratio of its lifetime)
+    presign_expires_in: int = Field(86400)
+    presign_refresh_ratio: float = Field(0.5)
+    presign_cache_size: int = Field(10000)
 
     class Config:
         env_file = BASE_DIR / ".env"  # fallback to .env file
@@ -1,20 +1,60 @@
+import time
 from datetime import datetime, timezone
 
-from sqlalchemy import DateTime
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from fastapi import Request, Response
+from sqlalchemy import Connection, DateTime, inspect, text
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.schema import CreateColumn
 
+from app.core import metrics
 from app.core.config import settings
+from app.core.metrics import instrument_queries
+from app.core.pool import PoolStats, instrument_engine, instrumented_pool
 
-DATABASE_URL = (
+DATABASE_URL = settings.db_url or (
     f"mysql+aiomysql://{settings.db_user}:{settings.db_password}"
     f"@{settings.db_host}:{settings.db_port}/{settings.db_name}"
 )
 
-engine = create_async_engine(DATABASE_URL, echo=settings.echo)
+STICKY_COOKIE = "db_primary_until"  # read-your-writes window of the client
+
+
+def _create_engine(url: str, stats: PoolStats) -> AsyncEngine:
+    engine = create_async_engine(
+        url,
+        echo=settings.echo,
+        poolclass=instrumented_pool(stats),
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+    instrument_engine(engine, stats)
+    instrument_queries(engine)
+    return engine
+
+
+pool_stats = PoolStats("primary")
+engine = _create_engine(DATABASE_URL, pool_stats)
+
+# Optional read replica with its own pool
+replica_pool_stats = PoolStats("replica")
+replica_engine = (
+    _create_engine(settings.db_replica_url, replica_pool_stats)
+    if settings.db_replica_url
+    else None
+)
 
 # Set expire_on_commit to False in async
 async_session = async_sessionmaker(engine, expire_on_commit=False)
+replica_session = async_sessionmaker(replica_engine or engine, expire_on_commit=False)
 
 
 class Base(DeclarativeBase):
@@ -34,6 +74,58 @@ async def get_session() -> AsyncSession:
         yield session
 
 
+# Read-only routes: replica, unless the client wrote within the sticky window
+async def get_read_session(request: Request) -> AsyncSession:
+    try:
+        sticky = float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        sticky = False
+
+    async with (async_session if sticky else replica_session)() as session:
+        yield session
+
+
+# Write routes: primary, and the client's next reads stick to it for a while
+async def get_write_session(response: Response) -> AsyncSession:
+    if replica_engine:
+        window = settings.db_read_your_writes_seconds
+        response.set_cookie(
+            STICKY_COOKIE,
+            str(time.time() + window),
+            max_age=max(int(window), 1),
+            httponly=True,
+            samesite="lax",
+        )
+
+    async with async_session() as session:
+        yield session
+
+
+def get_pool_stats() -> dict:
+    stats = {pool_stats.name: pool_stats.snapshot(engine.sync_engine.pool)}
+    if replica_engine:
+        stats[replica_pool_stats.name] = replica_pool_stats.snapshot(
+            replica_engine.sync_engine.pool
+        )
+    return stats
+
+
+def _collect_pool_metrics():
+    for name, stats in get_pool_stats().items():
+        metrics.db_pool_size.set(name, value=stats["pool_size"])
+        metrics.db_pool_checked_out.set(name, value=stats["checked_out"])
+        metrics.db_pool_overflow.set(name, value=stats["overflow"])
+        metrics.db_pool_checkouts.set(name, value=stats["checkouts"])
+        metrics.db_pool_timeouts.set(name, value=stats["timeouts"])
+        metrics.db_pool_wait.set(name, value=stats["wait"]["total_seconds"])
+        metrics.db_pool_connection_age.set(
+            name, value=stats["connections"]["max_age_seconds"]
+        )
+
+
+metrics.registry.collectors.append(_collect_pool_metrics)
+
+
 # Connect to DB and create tables (ddl-auto: update)
 async def init_db():
     import app.models  # noqa: F401
@@ -41,3 +133,41 @@ async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     return "Connected to DB successfully"
+
+
+# Add the columns and indexes declared after a table was created (opt-in, like init_db)
+# create_all never alters an existing table: documents.version, the list / line
+# order indexes and the FULLTEXT indexes only reach an existing database this way
+# idempotent, returns the statements' targets ("table.column" / index name)
+async def migrate_db() -> list[str]:
+    import app.models  # noqa: F401
+
+    async with engine.begin() as conn:
+        return await conn.run_sync(_migrate)
+
+
+def _migrate(conn: Connection) -> list[str]:
+    applied = []
+    preparer = conn.dialect.identifier_preparer
+    for table in Base.metadata.sorted_tables:
+        inspector = inspect(conn)
+        if not inspector.has_table(table.name):
+            continue  # created by init_db
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in columns:  # needs a server default or NULL
+                spec = CreateColumn(column).compile(dialect=conn.dialect)
+                conn.execute(
+                    text(
+                        f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {spec}"
+                    )
+                )
+                applied.append(f"{table.name}.{column.name}")
+
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(conn, checkfirst=True)  # FULLTEXT: MySQL only (ddl_if)
+        created = {index["name"] for index in inspect(conn).get_indexes(table.name)}
+        applied += sorted(created - existing)
+    return applied
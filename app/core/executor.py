@@ -0,0 +1,122 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable
+
+from app.core.config import settings
+
+# CPU-bound rendering (python-docx) runs in worker processes, not on the event loop
+# spawn: forking a process with a running event loop and driver threads is unsafe
+render_executor = ProcessPoolExecutor(
+    max_workers=settings.render_workers,
+    mp_context=multiprocessing.get_context("spawn"),
+)
+
+
+# fn and args must be picklable (module level function + plain data)
+async def run_in_render_pool(fn: Callable[..., Any], *args: Any) -> Any:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(render_executor, fn, *args)
+
+
+# Untrusted work (user regexes) in long-lived worker processes fed over a pipe,
+# a call past its deadline gets its process killed (replaced on the next call):
+# a pathological pattern cannot keep a worker busy, the render pool never runs it
+class DeadlinePool:
+    def __init__(self, max_workers: int):
+        self._context = multiprocessing.get_context("spawn")
+        self._slots = asyncio.Semaphore(max_workers)
+        self._idle: list[tuple] = []  # (process, connection)
+        self._workers: set[tuple] = set()
+
+    # `deadline` is time.monotonic() based, TimeoutError once it passes
+    async def run(self, deadline: float, fn: Callable[..., Any], *args: Any) -> Any:
+        await asyncio.wait_for(self._slots.acquire(), _remaining(deadline))
+        try:
+            worker = self._idle.pop() if self._idle else await self._start()
+            try:
+                ok, value = await asyncio.to_thread(
+                    _call, worker, fn, args, _remaining(deadline)
+                )
+            except BaseException:  # timed out, cancelled or died: never reused
+                self._kill(worker)
+                raise
+            self._idle.append(worker)
+        finally:
+            self._slots.release()
+        if not ok:
+            raise value
+        return value
+
+    # idle workers exit on EOF, busy ones are killed after a short wait
+    def shutdown(self):
+        for process, connection in self._workers:
+            connection.close()
+        for process, _ in self._workers:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.kill()
+        self._workers.clear()
+        self._idle.clear()
+
+    async def _start(self) -> tuple:
+        parent, child = self._context.Pipe()
+        process = self._context.Process(target=_serve, args=(child,), daemon=True)
+        await asyncio.to_thread(process.start)
+        child.close()
+        worker = (process, parent)
+        self._workers.add(worker)
+        return worker
+
+    def _kill(self, worker: tuple):
+        process, connection = worker
+        process.kill()
+        connection.close()
+        self._workers.discard(worker)
+
+
+def _remaining(deadline: float) -> float:
+    return max(deadline - time.monotonic(), 0)
+
+
+def _call(worker: tuple, fn: Callable[..., Any], args: tuple, timeout: float):
+    _, connection = worker
+    connection.send((fn, args))
+    if not connection.poll(timeout):
+        raise TimeoutError
+    return connection.recv()
+
+
+# Worker process loop: (ok, result or exception) per call
+def _serve(connection):
+    while True:
+        try:
+            fn, args = connection.recv()
+        except EOFError:
+            return
+        try:
+            connection.send((True, fn(*args)))
+        except Exception as e:  # noqa: BLE001 - raised again in the caller
+            connection.send((False, e))
+
+
+regex_pool = DeadlinePool(settings.replace_regex_workers)
+
+
+async def run_in_regex_pool(deadline: float, fn: Callable[..., Any], *args: Any) -> Any:
+    return await regex_pool.run(deadline, fn, *args)
+
+
+# Blocking boto3 calls run on their own bounded threads
+# (not the default executor shared with everything else, not the event loop)
+s3_executor = ThreadPoolExecutor(
+    max_workers=settings.s3_workers,
+    thread_name_prefix="s3",
+)
+
+
+async def run_in_s3_pool(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(s3_executor, partial(fn, *args, **kwargs))
@@ -0,0 +1,272 @@
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name, self.help, self.label_names = name, help, labels
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    # mirror a value counted elsewhere (collectors)
+    def set(self, *labels: str, value: float):
+        self.values[labels] = value
+
+    def samples(self):
+        for labels, value in self.values.items():
+            yield f"{self.name}{_labels(self.label_names, labels)} {value}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.name, self.help, self.label_names = name, help, labels
+        self.buckets = buckets
+        # labels -> [bucket counts..., sum, count]
+        self.values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, *labels: str, value: float):
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [0] * (len(self.buckets) + 2)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def samples(self):
+        for labels, series in self.values.items():
+            for bound, count in zip(self.buckets, series):
+                le = _labels(self.label_names, labels, f'le="{bound}"')
+                yield f"{self.name}_bucket{le} {count}"
+            le = _labels(self.label_names, labels, 'le="+Inf"')
+            yield f"{self.name}_bucket{le} {series[-1]}"
+            yield f"{self.name}_sum{_labels(self.label_names, labels)} {series[-2]}"
+            yield f"{self.name}_count{_labels(self.label_names, labels)} {series[-1]}"
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: list[Counter | Histogram] = []
+        self.collectors: list[Callable[[], None]] = []  # refresh gauges on scrape
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    # Prometheus text exposition format (0.0.4)
+    def render(self) -> str:
+        for collect in self.collectors:
+            collect()
+
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.register(
+    Counter(
+        "http_requests_total",
+        "HTTP requests",
+        ("method", "route", "status"),
+    )
+)
+http_request_duration = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "HTTP request latency (until the last body chunk is sent)",
+        ("method", "route"),
+    )
+)
+http_request_db_duration = registry.register(
+    Histogram(
+        "http_request_db_seconds",
+        "Time spent executing SQL statements per HTTP request",
+        ("method", "route"),
+    )
+)
+http_response_size = registry.register(
+    Histogram(
+        "http_response_size_bytes",
+        "HTTP response body size",
+        ("method", "route"),
+        SIZE_BUCKETS,
+    )
+)
+http_requests_in_flight = registry.register(
+    Gauge(
+        "http_requests_in_flight",
+        "HTTP requests being processed",
+        ("method", "route"),
+    )
+)
+db_query_duration = registry.register(
+    Histogram(
+        "db_query_duration_seconds",
+        "SQL statement latency by issuing route",
+        ("route", "statement"),
+    )
+)
+
+db_pool_size = registry.register(
+    Gauge("db_pool_size", "Connection pool size", ("engine",))
+)
+db_pool_checked_out = registry.register(
+    Gauge("db_pool_checked_out", "Connections checked out", ("engine",))
+)
+db_pool_overflow = registry.register(
+    Gauge("db_pool_overflow", "Overflow connections in use", ("engine",))
+)
+db_pool_checkouts = registry.register(
+    Counter("db_pool_checkouts_total", "Connection checkouts", ("engine",))
+)
+db_pool_timeouts = registry.register(
+    Counter("db_pool_timeouts_total", "Connection checkout timeouts", ("engine",))
+)
+db_pool_wait = registry.register(
+    Counter("db_pool_wait_seconds_total", "Time spent in checkout", ("engine",))
+)
+db_pool_connection_age = registry.register(
+    Gauge("db_pool_connection_max_age_seconds", "Oldest open connection", ("engine",))
+)
+
+merged_export_peak_bytes = registry.register(
+    Histogram(
+        "merged_export_peak_buffer_bytes",
+        "Peak bytes held in memory by a merged docx export",
+        ("engine",),
+        SIZE_BUCKETS + (67108864, 268435456),
+    )
+)
+
+
+# Route and SQL time of the request being processed (copied into tasks it spawns)
+@dataclass
+class RequestContext:
+    route: str
+    db_seconds: float = 0.0
+
+
+request_context: ContextVar[RequestContext | None] = ContextVar(
+    "request_context", default=None
+)
+
+
+# route template (/api/v1/documents/{document_id}) keeps label cardinality bounded
+def _route_of(scope: Scope) -> str:
+    app = scope.get("app")
+    partial = None
+    for route in getattr(getattr(app, "router", None), "routes", []):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or "unmatched"
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = _route_of(scope)
+        context = RequestContext(route)
+        token = request_context.set(context)
+        response_status = 500
+        response_size = 0
+
+        async def send_wrapper(message: Message):
+            nonlocal response_status, response_size
+            if message["type"] == "http.response.start":
+                response_status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        http_requests_in_flight.inc(method, route)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.inc(method, route, amount=-1)
+            http_request_duration.observe(
+                method, route, value=time.perf_counter() - start
+            )
+            http_request_db_duration.observe(method, route, value=context.db_seconds)
+            http_response_size.observe(method, route, value=response_size)
+            http_requests.inc(method, route, str(response_status))
+            request_context.reset(token)
+
+
+# Time every statement, tagged by the route that issued it
+def instrument_queries(engine: AsyncEngine):
+    target = engine.sync_engine
+
+    # one start time per connection (statements on a connection run one at a time),
+    # overwritten by the next statement: a failed one leaves nothing behind
+    @event.listens_for(target, "before_cursor_execute")
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        conn.info["query_start"] = time.perf_counter()
+
+    @event.listens_for(target, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info.pop("query_start", None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        request = request_context.get()
+        route = request.route if request else "background"
+        if request:
+            request.db_seconds += elapsed
+        kind = statement.lstrip().split(None, 1)[0].upper() if statement else ""
+        db_query_duration.observe(route, kind, value=elapsed)
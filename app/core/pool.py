@@ -0,0 +1,101 @@
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+
+# Live connection pool metrics of one engine
+class PoolStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.connects = 0
+        self.closes = 0
+        self.invalidations = 0
+        self.age_at_checkout_max = 0.0
+        self._connected_at: dict[int, float] = {}  # id(connection record) -> time
+
+    def observe_wait(self, seconds: float):
+        self.wait_count += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+
+    def snapshot(self, pool: AsyncAdaptedQueuePool) -> dict:
+        now = time.monotonic()
+        ages = [now - connected_at for connected_at in self._connected_at.values()]
+        return {
+            "pool_size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),  # negative while below pool_size
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait": {
+                "count": self.wait_count,
+                "total_seconds": self.wait_total,
+                "mean_seconds": self.wait_total / self.wait_count
+                if self.wait_count
+                else 0.0,
+                "max_seconds": self.wait_max,
+            },
+            "connections": {
+                "open": len(ages),
+                "connects": self.connects,
+                "closes": self.closes,
+                "invalidations": self.invalidations,
+                "max_age_seconds": max(ages, default=0.0),
+                "mean_age_seconds": sum(ages) / len(ages) if ages else 0.0,
+                "max_age_at_checkout_seconds": self.age_at_checkout_max,
+            },
+        }
+
+
+# Queue pool that times every checkout (waiting for a free slot + connecting)
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    stats: PoolStats
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            self.stats.observe_wait(time.perf_counter() - start)
+
+
+# pool class bound to stats (kept when the engine recreates its pool on dispose)
+def instrumented_pool(stats: PoolStats) -> type[InstrumentedPool]:
+    return type(f"{stats.name.title()}Pool", (InstrumentedPool,), {"stats": stats})
+
+
+def instrument_engine(engine: AsyncEngine, stats: PoolStats):
+    target = engine.sync_engine
+
+    @event.listens_for(target, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        stats.connects += 1
+        stats._connected_at[id(connection_record)] = time.monotonic()
+
+    @event.listens_for(target, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        stats.checkouts += 1
+        connected_at = stats._connected_at.get(id(connection_record))
+        if connected_at is not None:
+            age = time.monotonic() - connected_at
+            stats.age_at_checkout_max = max(stats.age_at_checkout_max, age)
+
+    @event.listens_for(target, "close")
+    def on_close(dbapi_connection, connection_record):
+        stats.closes += 1
+        stats._connected_at.pop(id(connection_record), None)
+
+    @event.listens_for(target, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        stats.invalidations += 1
@@ -1,11 +1,26 @@
-import boto3
+import threading
 
 from app.core import settings
 
-s3_client = boto3.client(
-    "s3",
-    endpoint_url=settings.s3_endpoint,
-    aws_access_key_id=settings.s3_access_key,
-    aws_secret_access_key=settings.s3_secret_key,
-    region_name=settings.s3_region,
-)
+_client = None
+_client_lock = threading.Lock()
+
+
+# Built on first use: importing boto3 + creating the client is the slowest part of a boot
+# first calls come from S3 pool threads at once, boto3's default session is not
+# thread-safe -> built under a lock
+def get_s3_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                import boto3
+
+                _client = boto3.client(
+                    "s3",
+                    endpoint_url=settings.s3_endpoint,
+                    aws_access_key_id=settings.s3_access_key,
+                    aws_secret_access_key=settings.s3_secret_key,
+                    region_name=settings.s3_region,
+                )
+    return _client
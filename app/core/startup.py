@@ -0,0 +1,48 @@
+import os
+import time
+
+
+# Seconds since this process started (Linux /proc), None where it is not available
+def _process_age() -> float | None:
+    try:
+        with open("/proc/self/stat") as f:
+            stat = f.read()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+    except OSError:
+        return None
+    start_ticks = int(stat.rsplit(")", 1)[1].split()[19])  # field 22: starttime
+    return max(uptime - start_ticks / os.sysconf("SC_CLK_TCK"), 0.0)
+
+
+# Wall time of the boot phases of this process, printed once the app is ready
+# "python": interpreter start + everything imported before app.core (fastapi, ...)
+class StartupReport:
+    def __init__(self):
+        now = time.perf_counter()
+        age = _process_age()
+        self.phases: list[tuple[str, float]] = []
+        if age is not None:
+            self.phases.append(("python", age))
+        self.from_process_start = age is not None
+        self.started_at = now - (age or 0.0)
+        self._last = now
+
+    def mark(self, phase: str):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def render(self) -> str:
+        lines = [
+            f"{phase:<10} {seconds * 1000:8.1f} ms" for phase, seconds in self.phases
+        ]
+        lines.append(f"{'total':<10} {(self._last - self.started_at) * 1000:8.1f} ms")
+        if not self.from_process_start:
+            lines.append(
+                "(from the app.core import, framework imports before it excluded)"
+            )
+        return "\n        ".join(lines)
+
+
+startup_report = StartupReport()  # created when app.core is first imported
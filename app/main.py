@@ -2,25 +2,53 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
-from app.core import engine, init_db, settings
-from app.routes import categories_router, documents_router
+from app.core import (
+    MetricsMiddleware,
+    engine,
+    regex_pool,
+    render_executor,
+    replica_engine,
+    s3_executor,
+    settings,
+    startup_report,
+)
+from app.routes import (
+    categories_router,
+    documents_router,
+    exports_router,
+    internal_router,
+)
+from app.services import cancel_exports
+from app.utils import render_cache
 
+startup_report.mark("routes")
 
+
+# Tables are not created here anymore: run `python init_db.py` once per database,
+# `python migrate_db.py` after an upgrade adds columns / indexes to existing tables
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    result = await init_db()
+    startup_report.mark("server")
     print(
         f"""
         ===============================
-        >>> {result}
         >>> Starting Editor Server
         Host: {settings.host}
         Port: {settings.port}
         ===============================
+        {startup_report.render()}
+        ===============================
         """
     )
     yield
+    await cancel_exports()  # Stop running export jobs
     await engine.dispose()  # Close DB connection
+    if replica_engine:
+        await replica_engine.dispose()
+    render_executor.shutdown(cancel_futures=True)  # Stop rendering workers
+    regex_pool.shutdown()  # Kill regex workers
+    s3_executor.shutdown(cancel_futures=True)  # Stop S3 threads
+    await render_cache.clear()  # Remove spilled files
     print(
         f"""
         ===============================
@@ -33,6 +61,11 @@ async def lifespan(app: FastAPI):
 
 
 app = FastAPI(lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(categories_router)
 app.include_router(documents_router)
+app.include_router(exports_router)
+app.include_router(internal_router)
+
+startup_report.mark("app")
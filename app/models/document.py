@@ -1,10 +1,15 @@
 import enum
+from typing import TYPE_CHECKING
 
-from sqlalchemy import BigInteger, Enum, ForeignKey, String
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import BigInteger, Enum, ForeignKey, Index, String
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
 
+if TYPE_CHECKING:
+    from app.models.script_line import ScriptLine
+    from app.models.speaker import Speaker
+
 
 class DocumentStatus(enum.Enum):
     PENDING = "pending"
@@ -14,6 +19,21 @@ class DocumentStatus(enum.Enum):
 
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (
+        # document list: (category_id, sort column, id) -> index range scan
+        # for every sort_by / order (keyset pagination included)
+        Index("ix_documents_category_id_id", "category_id", "id"),
+        Index("ix_documents_category_id_title", "category_id", "title", "id"),
+        Index("ix_documents_category_id_file_size", "category_id", "file_size", "id"),
+        Index("ix_documents_category_id_updated_at", "category_id", "updated_at", "id"),
+        # title search (n-gram parser: Korean has no word delimiters)
+        Index(
+            "ft_documents_title",
+            "title",
+            mysql_prefix="FULLTEXT",
+            mysql_with_parser="ngram",
+        ).ddl_if(dialect="mysql"),
+    )
 
     id: Mapped[int] = mapped_column(
         BigInteger,
@@ -59,3 +79,23 @@ class Document(Base):
         String(6),
         comment="Recording time (HHMMSS)",
     )
+
+    # ETag of the document, bumped by every script line sync (conditional UPDATE)
+    version: Mapped[int] = mapped_column(
+        default=1,
+        server_default="1",
+        comment="Content version",
+    )
+
+    # relationships (lazy="raise": always eager load them explicitly in async)
+    speakers: Mapped[list["Speaker"]] = relationship(
+        back_populates="document",
+        order_by="Speaker.id",
+        lazy="raise",
+    )
+
+    script_lines: Mapped[list["ScriptLine"]] = relationship(
+        back_populates="document",
+        order_by="ScriptLine.order",
+        lazy="raise",
+    )
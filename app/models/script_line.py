@@ -1,11 +1,28 @@
-from sqlalchemy import BigInteger, ForeignKey, String, Text
-from sqlalchemy.orm import Mapped, mapped_column
+from typing import TYPE_CHECKING
+
+from sqlalchemy import BigInteger, ForeignKey, Index, String, Text
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core import Base
 
+if TYPE_CHECKING:
+    from app.models.document import Document
+    from app.models.speaker import Speaker
+
 
 class ScriptLine(Base):
     __tablename__ = "script_lines"
+    __table_args__ = (
+        # lines of a document in order: detail, windows and streams are index range scans
+        Index("ix_script_lines_document_id_order", "document_id", "order", "id"),
+        # transcript search (n-gram parser: Korean has no word delimiters)
+        Index(
+            "ft_script_lines_text",
+            "text",
+            mysql_prefix="FULLTEXT",
+            mysql_with_parser="ngram",
+        ).ddl_if(dialect="mysql"),
+    )
 
     id: Mapped[int] = mapped_column(
         BigInteger,
@@ -40,3 +57,10 @@ class ScriptLine(Base):
         default=0,
         comment="Line order",
     )
+
+    document: Mapped["Document"] = relationship(
+        back_populates="script_lines",
+        lazy="raise",
+    )
+
+    speaker: Mapped["Speaker | None"] = relationship(lazy="raise")
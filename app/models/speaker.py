@@ -1,8 +1,13 @@
+from typing import TYPE_CHECKING
+
 from sqlalchemy import BigInteger, ForeignKey, String
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core import Base
 
+if TYPE_CHECKING:
+    from app.models.document import Document
+
 
 class Speaker(Base):
     __tablename__ = "speakers"
@@ -24,3 +29,8 @@ class Speaker(Base):
         default="New Speaker",
         comment="Speaker's Name",
     )
+
+    document: Mapped["Document"] = relationship(
+        back_populates="speakers",
+        lazy="raise",
+    )
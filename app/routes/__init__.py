@@ -1,4 +1,4 @@
-# TODO: require to add DTO class for response models later (next development + tuning phase)
-
 from .categories import router as categories_router
 from .documents import router as documents_router
+from .exports import router as exports_router
+from .internal import router as internal_router
@@ -1,10 +1,13 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Body, Depends, status
+from fastapi import APIRouter, Body, Depends, Query, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core import get_session
+from app.core import get_read_session
+from app.schemas import CategoryOut, DataResponse
 from app.services import download_merged_documents, get_categories
+from app.utils import DocxEngine, ExportFormat
 
 router = APIRouter(
     prefix="/api/v1/categories",
@@ -12,19 +15,23 @@ router = APIRouter(
 )
 
 
-# List categories
-@router.get("")
-async def get_categories_list(session: AsyncSession = Depends(get_session)):
+# List categories with document counts, total size and per-status counts
+@router.get("", response_model=DataResponse[list[CategoryOut]])
+async def get_categories_list(session: AsyncSession = Depends(get_read_session)):
     result = await get_categories(session)
-    return {
-        "status": status.HTTP_200_OK,
-        "data": result,
-    }
+    return ORJSONResponse(
+        {
+            "status": status.HTTP_200_OK,
+            "data": result,
+        }
+    )
 
 
 @router.post("/download")
 async def download_merged_by_category(
     category_ids: Annotated[list[int], Body()],
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
+    engine: Annotated[DocxEngine | None, Query()] = None,  # docx only
+    format: Annotated[ExportFormat, Query()] = "docx",
 ):
-    return await download_merged_documents(category_ids, session)
+    return await download_merged_documents(category_ids, session, engine, format)
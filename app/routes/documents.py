@@ -1,15 +1,49 @@
-from typing import Annotated
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Body, Depends, Path, Query, status
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    Header,
+    Path,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core import get_session
-from app.schemas import ScriptLineDiff
+from app.core import get_read_session, get_write_session
+from app.models import DocumentStatus
+from app.schemas import (
+    DataResponse,
+    DocumentDetail,
+    DocumentOut,
+    DocumentPage,
+    DocumentWithAudio,
+    ScriptLineDiff,
+    ScriptLineReplace,
+    ScriptLineWindow,
+)
 from app.services import (
     download_documents,
     get_document,
+    get_document_version,
     get_documents,
+    get_script_lines,
+    replace_script_lines,
+    search_documents,
+    stream_script_lines,
     sync_script_lines,
+    upload_audio,
+)
+from app.utils import (
+    DocxEngine,
+    ExportFormat,
+    etag_matches,
+    make_etag,
+    presign_period,
 )
 
 router = APIRouter(
@@ -18,17 +52,25 @@ router = APIRouter(
 )
 
 
-# List documents
-@router.get("")
+# List documents (rows are encoded by orjson directly, response_model documents the shape)
+@router.get(
+    "",
+    response_model=DataResponse[
+        list[DocumentOut] | list[DocumentWithAudio] | DocumentPage
+    ],
+)
 async def get_documents_list(
     category_id: Annotated[int, Query()],
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     sort_by: Annotated[str, Query()] = "id",
     order: Annotated[str, Query()] = "asc",
     page: Annotated[int, Query()] = 1,
     size: Annotated[int, Query()] = 20,
     q: Annotated[str | None, Query()] = None,
-    progress: Annotated[str | None, Query()] = None,
+    progress: Annotated[DocumentStatus | None, Query()] = None,
+    pagination: Annotated[Literal["offset", "cursor"], Query()] = "offset",
+    cursor: Annotated[str | None, Query()] = None,
+    with_audio_urls: Annotated[bool, Query()] = False,
 ):
     result = await get_documents(
         category_id,
@@ -39,42 +81,155 @@ async def get_documents_list(
         order,
         page,
         size,
+        pagination,
+        cursor,
+        with_audio_urls,
+    )
+    return ORJSONResponse(
+        {
+            "status": status.HTTP_200_OK,
+            "data": result,
+        }
     )
+
+
+# Search document titles and script lines (declared before /{document_id})
+@router.get("/search")
+async def search_documents_and_lines(
+    q: Annotated[str, Query(min_length=1)],
+    session: AsyncSession = Depends(get_read_session),
+    category_id: Annotated[int | None, Query()] = None,
+    limit: Annotated[int, Query(ge=1, le=200)] = 50,
+):
+    result = await search_documents(q, session, category_id, limit)
     return {
         "status": status.HTTP_200_OK,
         "data": result,
     }
 
 
-# Get document by ID
-@router.get("/{document_id}")
+# Get document by ID (same fast path as the list)
+# If-None-Match with the current ETag -> 304 after a version lookup only
+@router.get("/{document_id}", response_model=DataResponse[DocumentDetail])
 async def get_document_by_id(
     document_id: Annotated[int, Path()],
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
+    if_none_match: Annotated[str | None, Header()] = None,
 ):
+    period = presign_period()  # the response carries a presigned audio url
+    if if_none_match:
+        version = await get_document_version(document_id, session)
+        if etag_matches(if_none_match, version, period):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": make_etag(version, period)},
+            )
+
     result = await get_document(document_id, session)
-    return {
-        "status": status.HTTP_200_OK,
-        "data": result,
-    }
+    return ORJSONResponse(
+        {
+            "status": status.HTTP_200_OK,
+            "data": result,
+        },
+        headers={"ETag": make_etag(result["document"]["version"], period)},
+    )
+
+
+# Script lines of an order range / cursor window (no need to load the whole document)
+# stream=true: every matching line as NDJSON, sent while it is read
+@router.get(
+    "/{document_id}/script_lines",
+    response_model=DataResponse[ScriptLineWindow],
+)
+async def get_script_lines_window(
+    document_id: Annotated[int, Path()],
+    session: AsyncSession = Depends(get_read_session),
+    from_order: Annotated[int | None, Query()] = None,
+    to_order: Annotated[int | None, Query()] = None,
+    cursor: Annotated[str | None, Query()] = None,
+    size: Annotated[int, Query(ge=1, le=1000)] = 200,
+    stream: Annotated[bool, Query()] = False,
+):
+    if stream:
+        return await stream_script_lines(
+            document_id, session, from_order, to_order, cursor
+        )
+
+    result = await get_script_lines(
+        document_id, session, from_order, to_order, cursor, size
+    )
+    return ORJSONResponse(
+        {
+            "status": status.HTTP_200_OK,
+            "data": result,
+        },
+        headers={"ETag": make_etag(result["version"])},
+    )
 
 
 # Download single docx document by ID
 @router.post("/download")
 async def download_document_by_ids(
     document_ids: Annotated[list[int], Body()],
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
+    engine: Annotated[DocxEngine | None, Query()] = None,  # docx only
+    format: Annotated[ExportFormat, Query()] = "docx",
+):
+    return await download_documents(document_ids, session, engine, format)
+
+
+# Find and replace across a document / category / speaker in one request
+@router.post("/replace")
+async def replace_in_script_lines(
+    data: ScriptLineReplace,
+    session: AsyncSession = Depends(get_write_session),
 ):
-    return await download_documents(document_ids, session)
+    result = await replace_script_lines(data, session)
+    return {
+        "status": status.HTTP_200_OK,
+        "data": result,
+    }
+
+
+# Upload an audio file as the raw request body and create its document
+# (streamed to S3 in multipart parts, never held in memory as a whole)
+@router.post("/upload", status_code=status.HTTP_201_CREATED)
+async def upload_document_audio(
+    request: Request,
+    category_id: Annotated[int, Query()],
+    filename: Annotated[str, Query(min_length=1, max_length=255)],
+    recorded_date: Annotated[str, Query(pattern=r"^\d{6}$")],  # YYMMDD
+    recorded_time: Annotated[str, Query(pattern=r"^\d{6}$")],  # HHMMSS
+    session: AsyncSession = Depends(get_write_session),
+    title: Annotated[str | None, Query(max_length=255)] = None,
+    content_type: Annotated[str | None, Header()] = None,
+):
+    result = await upload_audio(
+        request.stream(),
+        session,
+        category_id=category_id,
+        title=title,
+        recorded_date=recorded_date,
+        recorded_time=recorded_time,
+        filename=filename,
+        content_type=content_type,
+    )
+    return {
+        "status": status.HTTP_201_CREATED,
+        "data": result,
+    }
 
 
 @router.patch("/{document_id}/script_lines")
 async def patch_script_lines(
     document_id: Annotated[int, Path()],
     data: ScriptLineDiff,
-    session: AsyncSession = Depends(get_session),
+    response: Response,
+    session: AsyncSession = Depends(get_write_session),
+    if_match: Annotated[str | None, Header()] = None,  # stale diff -> 412
 ):
-    result = await sync_script_lines(document_id, data, session)
+    result = await sync_script_lines(document_id, data, session, if_match)
+    response.headers["ETag"] = make_etag(result["version"])
     return {
         "status": status.HTTP_200_OK,
         "data": result,
@@ -0,0 +1,35 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Path, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import get_read_session
+from app.schemas import ExportCreate
+from app.services import create_export, get_export
+
+router = APIRouter(
+    prefix="/api/v1/exports",
+    tags=["exports"],
+)
+
+
+# Submit an export job (same request → same job), poll it for the file url
+@router.post("", status_code=status.HTTP_202_ACCEPTED)
+async def create_export_job(
+    data: ExportCreate,
+    session: AsyncSession = Depends(get_read_session),
+):
+    result = await create_export(data, session)
+    return {
+        "status": status.HTTP_202_ACCEPTED,
+        "data": result,
+    }
+
+
+@router.get("/{job_id}")
+async def get_export_job(job_id: Annotated[str, Path()]):
+    result = get_export(job_id)
+    return {
+        "status": status.HTTP_200_OK,
+        "data": result,
+    }
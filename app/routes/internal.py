@@ -0,0 +1,27 @@
+from fastapi import APIRouter, status
+from fastapi.responses import PlainTextResponse
+
+from app.core import get_pool_stats, registry
+
+router = APIRouter(
+    tags=["internal"],
+    include_in_schema=False,
+)
+
+
+# Prometheus scrape endpoint
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(
+        registry.render(),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
+# DB connection pool metrics (pool sizing)
+@router.get("/internal/pool")
+async def get_pool_metrics():
+    return {
+        "status": status.HTTP_200_OK,
+        "data": get_pool_stats(),
+    }
@@ -1 +1,14 @@
-from .documents import ScriptLineDiff
+from .categories import CategoryOut, StatusCounts
+from .documents import (
+    DataResponse,
+    DocumentDetail,
+    DocumentOut,
+    DocumentPage,
+    DocumentWithAudio,
+    ScriptLineDiff,
+    ScriptLineOut,
+    ScriptLineReplace,
+    ScriptLineWindow,
+    SpeakerOut,
+)
+from .exports import ExportCreate
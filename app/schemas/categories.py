@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class StatusCounts(BaseModel):
+    pending: int
+    in_progress: int
+    completed: int
+
+
+class CategoryOut(BaseModel):
+    id: int
+    name: str
+    created_at: datetime
+    updated_at: datetime
+    document_count: int
+    total_file_size: int  # bytes
+    status_counts: StatusCounts
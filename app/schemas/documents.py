@@ -1,7 +1,12 @@
-from typing import Literal
+from datetime import datetime
+from typing import Generic, Literal, TypeVar
 
 from pydantic import BaseModel, Field
 
+from app.models.document import DocumentStatus
+
+T = TypeVar("T")
+
 
 class SpeakerCreate(BaseModel):
     temp_id: str
@@ -24,7 +29,10 @@ class ScriptLineCreate(BaseModel):
     speaker_id: str  # 기존 speaker → DB id 문자열, 새 speaker → temp_id
     text: str
     start_time: str | None = Field(None)
-    order: int
+    order: int | None = Field(None)  # absolute order, or place it with after_id
+    after_id: str | None = Field(
+        None
+    )  # 기존 line → DB id 문자열, 새 line → temp_id, None → 맨 앞
 
 
 class ScriptLineUpdate(BaseModel):
@@ -39,10 +47,91 @@ class OrderItem(BaseModel):
     order: int
 
 
+# Move a line right after another one (server assigns a sparse order)
+class MoveItem(BaseModel):
+    id: int
+    after_id: str | None = Field(
+        None
+    )  # 기존 line → DB id 문자열, 새 line → temp_id, None → 맨 앞
+
+
 class ScriptLineDiff(BaseModel):
     speakers: SpeakerDiff = SpeakerDiff()
     created: list[ScriptLineCreate] = Field([])
     updated: list[ScriptLineUpdate] = Field([])
     deleted: list[int] = Field([])
     orders: list[OrderItem] = Field([])
+    moves: list[MoveItem] = Field([])
     status: Literal["in_progress", "completed"] | None = Field(None)
+
+
+# Find and replace in the lines of a document / category / speaker
+class ScriptLineReplace(BaseModel):
+    scope: Literal["document", "category", "speaker"]
+    scope_id: int
+    find: str = Field(min_length=1)
+    replace: str
+    regex: bool = Field(False)  # Python re syntax, replace may use \1 / \g<name>
+    preview: bool = Field(False)  # count matches only, nothing is written
+
+
+# Responses (field names are also the selected columns, see app.utils.serialize)
+class DocumentOut(BaseModel):
+    id: int
+    category_id: int
+    title: str
+    audio_url: str | None
+    file_size: int
+    status: DocumentStatus
+    recorded_date: str
+    recorded_time: str
+    version: int
+    created_at: datetime
+    updated_at: datetime
+
+
+class SpeakerOut(BaseModel):
+    id: int
+    document_id: int
+    name: str
+    created_at: datetime
+    updated_at: datetime
+
+
+class ScriptLineOut(BaseModel):
+    id: int
+    document_id: int
+    speaker_id: int | None
+    text: str
+    start_time: str | None
+    order: int
+    created_at: datetime
+    updated_at: datetime
+
+
+class DocumentWithAudio(BaseModel):
+    document: DocumentOut
+    audio_presigned_url: str | None
+
+
+class DocumentDetail(DocumentWithAudio):
+    speakers: list[SpeakerOut]
+    script_lines: list[ScriptLineOut]
+
+
+class DocumentPage(BaseModel):
+    items: list[DocumentOut] | list[DocumentWithAudio]
+    next_cursor: str | None
+    prev_cursor: str | None
+
+
+class ScriptLineWindow(BaseModel):
+    version: int  # document version the window was read at (ETag)
+    items: list[ScriptLineOut]
+    next_cursor: str | None
+
+
+# {"status": ..., "data": ...} envelope of every JSON response
+class DataResponse(BaseModel, Generic[T]):
+    status: int
+    data: T
@@ -0,0 +1,12 @@
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+from app.utils import DocxEngine, ExportFormat
+
+
+class ExportCreate(BaseModel):
+    kind: Literal["documents", "categories"]  # zip of documents / merged category docx
+    ids: list[int] = Field(min_length=1)
+    engine: DocxEngine | None = Field(None)  # None → settings
+    format: ExportFormat = Field("docx")
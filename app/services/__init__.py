@@ -2,6 +2,13 @@ from .categories import download_merged_documents, get_categories
 from .documents import (
     download_documents,
     get_document,
+    get_document_version,
     get_documents,
+    get_script_lines,
+    stream_script_lines,
     sync_script_lines,
 )
+from .exports import cancel_exports, create_export, get_export
+from .replace import replace_script_lines
+from .search import search_documents
+from .uploads import upload_audio
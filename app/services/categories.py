@@ -1,20 +1,99 @@
 from fastapi.responses import StreamingResponse
-from sqlalchemy import select
+from sqlalchemy import case, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core import settings
 from app.models.category import Category
-from app.utils.docx import make_merged_docx
+from app.models.document import Document, DocumentStatus
+from app.services.documents import transcript_response
+from app.utils import (
+    DOCX_TYPE,
+    MERGED_ORDER,
+    ExportFormat,
+    category_stats_cache,
+    export_rows_query,
+    fetch_dicts,
+    iter_spooled,
+    spool,
+)
+from app.utils.docx import DocxEngine, make_merged_docx, stream_merged_docx
 
 
+# Categories with document stats, served from a short TTL cache
+# (dropped early by sync_script_lines when a document status changes)
 async def get_categories(session: AsyncSession):
-    result = await session.execute(select(Category))
-    return result.scalars().all()
+    categories = category_stats_cache.get()
+    if categories is None:
+        generation = category_stats_cache.generation
+        categories = await _load_categories(session)
+        category_stats_cache.set(categories, generation)
+    return categories
 
 
-async def download_merged_documents(category_ids: list[int], session: AsyncSession):
-    buffer = await make_merged_docx(category_ids, session)
+# One GROUP BY over documents, left joined so empty categories are listed too
+async def _load_categories(session: AsyncSession) -> list[dict]:
+    stats = (
+        select(
+            Document.category_id,
+            func.count(Document.id).label("document_count"),
+            func.sum(Document.file_size).label("total_file_size"),
+            *[
+                func.count(case((Document.status == s, 1))).label(s.value)
+                for s in DocumentStatus
+            ],
+        )
+        .group_by(Document.category_id)
+        .subquery()
+    )
+    query = (
+        select(
+            Category.id,
+            Category.name,
+            Category.created_at,
+            Category.updated_at,
+            *[
+                func.coalesce(column, 0).label(column.key)
+                for column in stats.c
+                if column.key != "category_id"
+            ],
+        )
+        .outerjoin(stats, stats.c.category_id == Category.id)
+        .order_by(Category.id)
+    )
+
+    categories = await fetch_dicts(session, query)
+    for category in categories:
+        category["total_file_size"] = int(category["total_file_size"])  # SUM -> DECIMAL
+        category["status_counts"] = {
+            s.value: category.pop(s.value) for s in DocumentStatus
+        }
+    return categories
+
+
+async def download_merged_documents(
+    category_ids: list[int],
+    session: AsyncSession,
+    engine: DocxEngine | None = None,
+    format: ExportFormat = "docx",
+):
+    if format != "docx":
+        # txt: one merged file like the docx, srt / vtt: a zip with a file per document
+        # (every recording has its own timeline)
+        query = export_rows_query(Document.category_id.in_(category_ids), *MERGED_ORDER)
+        if format == "txt":
+            return await transcript_response(query, session.bind, format, "merged.txt")
+        return await transcript_response(query, session.bind, format, "subtitles.zip")
+
+    engine = engine or settings.docx_engine
+    if engine == "stream":
+        # written from the cursor into a spooled file first, then sent from the file
+        # (a slow client never holds the DB connection / cursor open)
+        file = await spool(stream_merged_docx(category_ids, session.bind))
+        content = iter_spooled(file)
+    else:
+        content = await make_merged_docx(category_ids, session, engine)
     return StreamingResponse(
-        buffer,
-        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",  # docx file type (HTTP protocol)
+        content,
+        media_type=DOCX_TYPE,  # docx file type (HTTP protocol)
         headers={"Content-Disposition": "attachment; filename*=UTF-8''merged.docx"},
     )
@@ -1,45 +1,98 @@
-import asyncio
+from datetime import datetime, timezone
+from functools import partial
 from urllib.parse import quote
 
+import orjson
 from fastapi import HTTPException, status
 from fastapi.responses import StreamingResponse
-from sqlalchemy import delete, select, update
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Select, and_, delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
-from app.models.document import Document
+from app.core import settings
+from app.models.document import Document, DocumentStatus
 from app.models.script_line import ScriptLine
 from app.models.speaker import Speaker
-from app.schemas import ScriptLineDiff
-from app.utils import generate_presigned_url, make_docx, make_zip
+from app.schemas import DocumentOut, ScriptLineDiff, ScriptLineOut, SpeakerOut
+from app.utils import (
+    DOCX_TYPE,
+    MEDIA_TYPES,
+    DocxEngine,
+    ExportFormat,
+    LineOrder,
+    TranscriptFormat,
+    category_stats_cache,
+    check_cursor_fields,
+    check_if_match,
+    decode_cursor,
+    dto_columns,
+    encode_cursor,
+    export_rows_query,
+    fetch_dicts,
+    generate_presigned_urls,
+    insert_returning_ids,
+    iter_spooled,
+    make_docx,
+    map_bounded,
+    render_cache,
+    spool,
+    stream_transcript,
+    stream_transcript_zip,
+    stream_zip,
+    text_matches,
+    update_by_id,
+)
+
+# sort_by -> column, every one has a (category_id, column, id) index
+SORT_COLUMNS = {
+    "id": Document.id,
+    "title": Document.title,
+    "file_size": Document.file_size,
+    "updated_at": Document.updated_at,
+}
+# sort_by -> JSON type of the cursor value (datetimes are ISO strings)
+CURSOR_VALUE_TYPES = {"id": int, "title": str, "file_size": int, "updated_at": str}
+
+STREAM_CHUNK = 1000  # rows fetched per round trip when streaming script lines
+
+# Selected columns of the JSON responses (rows are returned as dicts)
+DOCUMENT_COLUMNS = dto_columns(Document, DocumentOut)
+SPEAKER_COLUMNS = dto_columns(Speaker, SpeakerOut)
+SCRIPT_LINE_COLUMNS = dto_columns(ScriptLine, ScriptLineOut)
 
 
 async def get_documents(
     category_id: int,
     session: AsyncSession,
     q: str | None = None,
-    progress: str | None = None,
+    progress: DocumentStatus | None = None,
     sort_by: str = "id",
     order: str = "asc",
     page: int = 1,
     size: int = 20,
+    pagination: str = "offset",
+    cursor: str | None = None,
+    with_audio_urls: bool = False,
 ):
-    query = select(Document).where(Document.category_id == category_id)
+    query = select(*DOCUMENT_COLUMNS).where(Document.category_id == category_id)
 
-    # User search query (title)
+    # User search query (title, FULLTEXT index on MySQL)
     if q:
-        query = query.where(Document.title.ilike(f"%{q}%"))
+        query = query.where(text_matches(session, Document.title, q))
 
     # filter by progress
     if progress:
         query = query.where(Document.status == progress)
 
     # sort by
-    sort_column = {
-        "id": Document.id,
-        "title": Document.title,
-        "file_size": Document.file_size,
-        "updated_at": Document.updated_at,
-    }.get(sort_by, Document.id)
+    if sort_by not in SORT_COLUMNS:
+        sort_by = "id"
+    sort_column = SORT_COLUMNS[sort_by]
+
+    if pagination == "cursor":
+        page = await _get_documents_page(query, session, sort_by, order, size, cursor)
+        if with_audio_urls:
+            page["items"] = await _with_audio_urls(page["items"])
+        return page
 
     # order by
     if order == "desc":
@@ -50,93 +103,382 @@ async def get_documents(
     # offset and limit
     query = query.offset((page - 1) * size).limit(size)
 
-    result = await session.execute(query)
-    return result.scalars().all()
+    documents = await fetch_dicts(session, query)
+    if with_audio_urls:
+        return await _with_audio_urls(documents)
+    return documents
 
 
-#  TODO: has to be updated to single query with relationships later (next development + tuning phase)
-async def get_document(document_id: int, session: AsyncSession):
-    result = await session.execute(select(Document).where(Document.id == document_id))
-    document = result.scalar_one_or_none()
+# Attach audio urls for a whole page (one batched presign call)
+async def _with_audio_urls(documents: list[dict]) -> list[dict]:
+    urls = await generate_presigned_urls([d["audio_url"] for d in documents])
+    return [
+        {"document": d, "audio_presigned_url": urls.get(d["audio_url"])}
+        for d in documents
+    ]
 
-    if not document:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Document not found",
+
+# Keyset pagination: WHERE (sort column, id) after the cursor row, no OFFSET scan
+async def _get_documents_page(
+    query: Select,
+    session: AsyncSession,
+    sort_by: str,
+    order: str,
+    size: int,
+    cursor: str | None,
+):
+    sort_column = SORT_COLUMNS[sort_by]
+    descending = order == "desc"
+    backward = False
+
+    if cursor:
+        data = decode_cursor(cursor)
+        if data.get("sort_by") != sort_by or data.get("order") != order:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor does not match sort_by and order",
+            )
+        check_cursor_fields(
+            data, value=CURSOR_VALUE_TYPES[sort_by], id=int, direction=str
         )
+        value = data["value"]
+        if sort_by == "updated_at":
+            try:
+                value = datetime.fromisoformat(value)
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid cursor",
+                )
+        backward = data["direction"] == "prev"
+
+        # prev page: scan the other way from the cursor and reverse the rows
+        if descending != backward:
+            after = or_(
+                sort_column < value,
+                and_(sort_column == value, Document.id < data["id"]),
+            )
+        else:
+            after = or_(
+                sort_column > value,
+                and_(sort_column == value, Document.id > data["id"]),
+            )
+        query = query.where(after)
 
-    speakers = await session.execute(
-        select(Speaker).where(Speaker.document_id == document_id)
-    )
+    if descending != backward:
+        query = query.order_by(sort_column.desc(), Document.id.desc())
+    else:
+        query = query.order_by(sort_column.asc(), Document.id.asc())
+
+    # one extra row tells whether there is a next page
+    documents = await fetch_dicts(session, query.limit(size + 1))
+    has_more = len(documents) > size
+    documents = documents[:size]
+    if backward:
+        documents.reverse()
+
+    def make_cursor(document: dict, direction: str) -> str:
+        return encode_cursor(
+            {
+                "sort_by": sort_by,
+                "order": order,
+                "value": document[sort_column.key],
+                "id": document["id"],
+                "direction": direction,
+            }
+        )
+
+    has_next = has_more if not backward else True
+    has_prev = has_more if backward else cursor is not None
+    return {
+        "items": documents,
+        "next_cursor": make_cursor(documents[-1], "next")
+        if documents and has_next
+        else None,
+        "prev_cursor": make_cursor(documents[0], "prev")
+        if documents and has_prev
+        else None,
+    }
 
-    script_lines = await session.execute(
-        select(ScriptLine)
+
+# Column rows only (no ORM graph), the route encodes them straight to JSON
+# same 2 round trips as load_document: speakers are joined into the document row
+# (a few per document), lines come from one ordered query; the url is signed after
+async def get_document(document_id: int, session: AsyncSession):
+    result = await session.execute(
+        select(
+            *DOCUMENT_COLUMNS,
+            *[column.label(f"speaker_{column.key}") for column in SPEAKER_COLUMNS],
+        )
+        .outerjoin(Speaker, Speaker.document_id == Document.id)
+        .where(Document.id == document_id)
+        .order_by(Speaker.id)
+    )
+    rows = result.all()
+    if not rows:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Document {document_id} not found",
+        )
+    n = len(DOCUMENT_COLUMNS)
+    document = dict(zip([column.key for column in DOCUMENT_COLUMNS], rows[0][:n]))
+    speakers = [
+        dict(zip([column.key for column in SPEAKER_COLUMNS], row[n:]))
+        for row in rows
+        if row[n] is not None  # no speakers: one row of NULLs
+    ]
+
+    script_lines = await fetch_dicts(
+        session,
+        select(*SCRIPT_LINE_COLUMNS)
         .where(ScriptLine.document_id == document_id)
-        .order_by(ScriptLine.order)
+        .order_by(ScriptLine.order, ScriptLine.id),
     )
+    urls = await generate_presigned_urls([document["audio_url"]])
 
     return {
         "document": document,
-        "audio_presigned_url": generate_presigned_url(document.audio_url),
-        "speakers": speakers.scalars().all(),
-        "script_lines": script_lines.scalars().all(),
+        "audio_presigned_url": urls.get(document["audio_url"]),
+        "speakers": speakers,
+        "script_lines": script_lines,
     }
 
 
+# Single indexed lookup for conditional requests (ETag)
+async def get_document_version(document_id: int, session: AsyncSession) -> int:
+    result = await session.execute(
+        select(Document.version).where(Document.id == document_id)
+    )
+    version = result.scalar_one_or_none()
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Document {document_id} not found",
+        )
+    return version
+
+
+# Lines of a document in (order, id) order
+# order range [from_order, to_order) + keyset cursor (ix_script_lines_document_id_order)
+def _script_lines_query(
+    document_id: int,
+    from_order: int | None,
+    to_order: int | None,
+    cursor: str | None,
+) -> Select:
+    query = (
+        select(*SCRIPT_LINE_COLUMNS)
+        .where(ScriptLine.document_id == document_id)
+        .order_by(ScriptLine.order, ScriptLine.id)
+    )
+    if from_order is not None:
+        query = query.where(ScriptLine.order >= from_order)
+    if to_order is not None:
+        query = query.where(ScriptLine.order < to_order)
+
+    if cursor:
+        data = decode_cursor(cursor)
+        check_cursor_fields(data, order=int, id=int)
+        query = query.where(
+            or_(
+                ScriptLine.order > data["order"],
+                and_(ScriptLine.order == data["order"], ScriptLine.id > data["id"]),
+            )
+        )
+    return query
+
+
+# One window of `size` lines, the next window starts from next_cursor
+async def get_script_lines(
+    document_id: int,
+    session: AsyncSession,
+    from_order: int | None = None,
+    to_order: int | None = None,
+    cursor: str | None = None,
+    size: int = 200,
+):
+    version = await get_document_version(document_id, session)
+    query = _script_lines_query(document_id, from_order, to_order, cursor)
+    lines = await fetch_dicts(session, query.limit(size + 1))
+
+    next_cursor = None
+    if len(lines) > size:
+        lines = lines[:size]
+        next_cursor = encode_cursor(
+            {"order": lines[-1]["order"], "id": lines[-1]["id"]}
+        )
+
+    return {"version": version, "items": lines, "next_cursor": next_cursor}
+
+
+# Every matching line as NDJSON, read from a server-side cursor STREAM_CHUNK rows at a time
+# (memory is bounded by the chunk, not by the transcript)
+async def stream_script_lines(
+    document_id: int,
+    session: AsyncSession,
+    from_order: int | None = None,
+    to_order: int | None = None,
+    cursor: str | None = None,
+):
+    await get_document_version(document_id, session)  # 404 before streaming starts
+    await session.rollback()  # the stream reads on its own connection
+    query = _script_lines_query(document_id, from_order, to_order, cursor)
+    return StreamingResponse(
+        _ndjson_rows(query.execution_options(yield_per=STREAM_CHUNK), session.bind),
+        media_type="application/x-ndjson",
+    )
+
+
+# Own session on the request's engine (primary / replica): the stream outlives the request
+async def _ndjson_rows(query: Select, bind: AsyncEngine):
+    async with AsyncSession(bind) as session:
+        result = await session.stream(query)
+        keys = list(result.keys())
+        async for rows in result.partitions():
+            yield b"".join(orjson.dumps(dict(zip(keys, row))) + b"\n" for row in rows)
+
+
+# Render one zip entry with its own session (AsyncSession is not safe for concurrent use)
+# on the engine the request was routed to (primary / replica)
+async def make_zip_entry(
+    document_id: int, bind: AsyncEngine, engine: DocxEngine | None
+) -> tuple[int, str, bytes]:
+    async with AsyncSession(bind, expire_on_commit=False) as session:
+        title, buffer = await make_docx(document_id, session, engine)
+    return document_id, title, buffer.getvalue()
+
+
 # Download docx document by ID
-async def download_documents(document_ids: list[int], session: AsyncSession):
+async def download_documents(
+    document_ids: list[int],
+    session: AsyncSession,
+    engine: DocxEngine | None = None,
+    format: ExportFormat = "docx",
+):
+    if format != "docx":
+        return await _download_transcripts(document_ids, session, format)
+
     if len(document_ids) == 1:
-        title, buffer = await make_docx(document_ids[0], session)
+        title, buffer = await make_docx(document_ids[0], session, engine)
+        await session.rollback()  # the request's connection is not held during the send
         return StreamingResponse(
             buffer,
-            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",  # docx file type (HTTP protocol)
+            media_type=DOCX_TYPE,  # docx file type (HTTP protocol)
             headers={
                 "Content-Disposition": f"attachment; filename*=UTF-8''{quote(title)}.docx"  # download immidiately without opening in browser
             },
         )
 
-    results = await asyncio.gather(
-        *[make_docx(doc_id, session) for doc_id in document_ids]
+    # check every document before the first byte is sent (no 404 after streaming starts)
+    result = await session.execute(
+        select(Document.id).where(Document.id.in_(document_ids))
     )
-    zip_buffer = make_zip([f"{title}.docx", buffer] for title, buffer in results)
+    missing = set(document_ids) - set(result.scalars().all())
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Document {min(missing)} not found",
+        )
+    await session.rollback()  # every entry is rendered on its own session
 
+    files = map_bounded(
+        partial(make_zip_entry, bind=session.bind, engine=engine),
+        document_ids,
+        settings.export_concurrency,
+    )
     return StreamingResponse(
-        zip_buffer,
+        stream_zip(files, "docx"),
         media_type="application/zip",
         headers={"Content-Disposition": "attachment; filename*=UTF-8''documents.zip"},
     )
 
 
+# txt / srt / vtt straight from a streamed query (no rendering, no render pool)
+# one document -> its file, several -> zip with a file per document
+async def _download_transcripts(
+    document_ids: list[int], session: AsyncSession, format: ExportFormat
+):
+    result = await session.execute(
+        select(Document.id, Document.title).where(Document.id.in_(document_ids))
+    )
+    titles = dict(result.all())
+    await session.rollback()  # the request's connection is not held during the send
+    missing = set(document_ids) - set(titles)
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Document {min(missing)} not found",
+        )
+
+    query = export_rows_query(Document.id.in_(document_ids))
+    if len(titles) == 1:
+        title = next(iter(titles.values())).replace(".txt", "")
+        return await transcript_response(
+            query, session.bind, format, f"{title}.{format}"
+        )
+    return await transcript_response(query, session.bind, format, "documents.zip")
+
+
+# Transcript download of the export rows, a .zip filename -> a file per document
+# drained into a spooled file first (own session, released before the first byte),
+# so a slow client does not hold the cursor or a pooled connection
+async def transcript_response(
+    query: Select, bind: AsyncEngine, format: TranscriptFormat, filename: str
+) -> StreamingResponse:
+    if filename.endswith(".zip"):
+        chunks = stream_transcript_zip(query, bind, format)
+        media_type = "application/zip"
+    else:
+        chunks = stream_transcript(query, bind, format)
+        media_type = MEDIA_TYPES[format]
+    return StreamingResponse(
+        iter_spooled(await spool(chunks)),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}"
+        },
+    )
+
+
 async def sync_script_lines(
     document_id: int,
     diff: ScriptLineDiff,
     session: AsyncSession,
+    if_match: str | None = None,
 ):
-    # 1. Check if document exists + create temp values for speakers and lines
-    result = await session.execute(select(Document).where(Document.id == document_id))
-    document = result.scalar_one_or_none()
-    if not document:
+    # 1. Check if document exists + reject a stale diff (If-Match) before any write
+    result = await session.execute(
+        select(Document.version).where(Document.id == document_id)
+    )
+    version = result.scalar_one_or_none()
+    if version is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Document not found",
         )
+    check_if_match(if_match, version)
+
+    # 2. create speakers, if diff.speakers.created != [] (single INSERT)
+    # 생성된 id를 temp_id 순서대로 받아서 temp에 저장 (커밋은 안함)
+    speaker_ids = await insert_returning_ids(
+        session,
+        Speaker,
+        [
+            {"document_id": document_id, "name": spk.name}
+            for spk in diff.speakers.created
+        ],
+    )
+    speaker_temp_map = {
+        spk.temp_id: speaker_id
+        for spk, speaker_id in zip(diff.speakers.created, speaker_ids)
+    }
 
-    speaker_temp_map: dict[str, int] = {}
-    line_temp_map: dict[str, int] = {}
-
-    # 2. create speakers, if diff.speakers.created != [] by loop
-    # 해당 Speaker 객체를 트랜젝션 메니저에 올린 후 -> flush() -> 반환 받은 id를 temp에 저장 (커밋은 안함)
-    for spk in diff.speakers.created:
-        new_speaker = Speaker(document_id=document_id, name=spk.name)
-        session.add(new_speaker)  # add to transaction
-        await session.flush()  # flush to get the new speaker id
-        speaker_temp_map[spk.temp_id] = new_speaker.id
-
-    # 3. update speaker's name, if diff.speakers.updated != [] by loop
-    for spk in diff.speakers.updated:
-        await session.execute(
-            update(Speaker).where(Speaker.id == spk.id).values(name=spk.name)
-        )
+    # 3. update speaker's name, if diff.speakers.updated != [] (single UPDATE)
+    await update_by_id(
+        session,
+        Speaker,
+        {spk.id: {"name": spk.name} for spk in diff.speakers.updated},
+    )
 
     # 4. delete script lines first, if diff.deleted != []
     if diff.deleted:
@@ -144,32 +486,43 @@ async def sync_script_lines(
             delete(ScriptLine).where(ScriptLine.id.in_(diff.deleted))  # bulk delete
         )
 
-    # 5. create script lines, if diff.created != [] by loop
-    for line in diff.created:
-        # temp_id (새로 추가된 화자의 id)면, speaker_temp_map에서 flush후 받은 실제 id 사용
-        # 기존 화자 id면, 그대로 사용
-        real_speaker_id = speaker_temp_map.get(line.speaker_id) or int(line.speaker_id)
-        new_line = ScriptLine(
-            document_id=document_id,
-            speaker_id=real_speaker_id,
-            text=line.text,
-            start_time=line.start_time,
-            order=line.order,
-        )
-        session.add(new_line)
-        await session.flush()
-        line_temp_map[line.temp_id] = new_line.id
-
-    # 6. update script lines, if diff.updated != [] by loop
-    for line in diff.updated:
-        values = line.model_dump(exclude_unset=True)  # 요청으로 들어온 필드값만 추출
-        values.pop("id")  # exclude id from values (id is primary key)
-        if values:
-            await session.execute(
-                update(ScriptLine)
-                .where(ScriptLine.id == line.id)
-                .values(**values)  # **unpaking
-            )
+    # 4-1. place lines relative to each other (after_id), only touched rows get a new order
+    layout = None
+    if diff.moves or any(line.order is None for line in diff.created):
+        layout = await _layout_lines(document_id, diff, session)
+
+    # 5. create script lines, if diff.created != [] (single INSERT)
+    # temp_id (새로 추가된 화자의 id)면, speaker_temp_map에서 받은 실제 id 사용
+    # 기존 화자 id면, 그대로 사용
+    line_ids = await insert_returning_ids(
+        session,
+        ScriptLine,
+        [
+            {
+                "document_id": document_id,
+                "speaker_id": speaker_temp_map.get(line.speaker_id)
+                or int(line.speaker_id),
+                "text": line.text,
+                "start_time": line.start_time,
+                "order": layout.changed[line.temp_id] if layout else line.order,
+            }
+            for line in diff.created
+        ],
+    )
+    line_temp_map = {
+        line.temp_id: line_id for line, line_id in zip(diff.created, line_ids)
+    }
+
+    # 6. update script lines, if diff.updated != [] (single UPDATE)
+    # 요청으로 들어온 필드값만 추출 (exclude id, id is primary key)
+    await update_by_id(
+        session,
+        ScriptLine,
+        {
+            line.id: line.model_dump(exclude_unset=True, exclude={"id"})
+            for line in diff.updated
+        },
+    )
 
     # 7. delete speakers first, if diff.speakers.deleted != []
     if diff.speakers.deleted:
@@ -177,24 +530,125 @@ async def sync_script_lines(
             delete(Speaker).where(Speaker.id.in_(diff.speakers.deleted))  # bulk delete
         )
 
-    # 8. re-order script lines, if diff.orders != [] by loop
-    for item in diff.orders:
-        await session.execute(
-            update(ScriptLine).where(ScriptLine.id == item.id).values(order=item.order)
+    # 8. re-order script lines, if diff.orders != [] or lines were placed (single UPDATE)
+    orders = {item.id: item.order for item in diff.orders}
+    if layout:
+        orders.update(
+            (key, order)
+            for key, order in layout.changed.items()
+            if isinstance(key, int)
         )
+    await update_by_id(
+        session,
+        ScriptLine,
+        {line_id: {"order": order} for line_id, order in orders.items()},
+    )
 
-    # 9. status update, if diff.status is not None
+    # 9. bump version + touch document + status update
+    # with If-Match only the version checked in step 1 is bumped (concurrent sync -> 412)
+    values = {
+        "version": Document.version + 1,
+        "updated_at": datetime.now(timezone.utc),
+    }
     if diff.status:
-        await session.execute(
-            update(Document)
-            .where(Document.id == document_id)
-            .values(status=diff.status)
+        values["status"] = DocumentStatus(diff.status)  # stored by enum name
+    query = update(Document).where(Document.id == document_id)
+    if if_match is not None:
+        query = query.where(Document.version == version)
+    result = await session.execute(query.values(**values))
+    if result.rowcount == 0:  # another sync committed after step 1
+        await session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Document has been modified",
         )
+    version = await get_document_version(document_id, session)
 
-    # 10. commit all changes
+    # 10. commit all changes + drop rendered files of the old version
     await session.commit()
+    await render_cache.invalidate(document_id)
+    if diff.status:
+        category_stats_cache.invalidate()  # status counts of the category listing
 
-    return {
+    result = {
+        "version": version,
         "speakers": list(speaker_temp_map.items()),
         "lines": list(line_temp_map.items()),
     }
+    if layout:
+        # server assigned orders, keyed by real ids
+        result["orders"] = [
+            [line_temp_map.get(key, key), order]
+            for key, order in layout.changed.items()
+        ]
+    return result
+
+
+# The diff's absolute orders, then relative placements in request order
+# only the referenced lines and their neighbours are read, not the whole document
+async def _layout_lines(
+    document_id: int, diff: ScriptLineDiff, session: AsyncSession
+) -> LineOrder:
+    temp_ids = {line.temp_id for line in diff.created}
+
+    def resolve(after_id: str | None):
+        if after_id is None or after_id in temp_ids:
+            return after_id
+        try:
+            return int(after_id)
+        except ValueError:
+            return after_id  # unknown temp_id, rejected below
+
+    placements = [
+        (line.temp_id, line.after_id) for line in diff.created if line.order is None
+    ]
+    placements += [(move.id, move.after_id) for move in diff.moves]
+
+    # neighbours on the (document_id, order, id) index
+    async def fetch(low, high, limit, descending):
+        query = select(ScriptLine.id, ScriptLine.order).where(
+            ScriptLine.document_id == document_id
+        )
+        if low is not None:
+            query = query.where(ScriptLine.order > low)
+        if high is not None:
+            query = query.where(ScriptLine.order < high)
+        if descending:
+            query = query.order_by(ScriptLine.order.desc(), ScriptLine.id.desc())
+        else:
+            query = query.order_by(ScriptLine.order, ScriptLine.id)
+        result = await session.execute(query.limit(limit))
+        return result.all()
+
+    referenced = {
+        key
+        for placement in placements
+        for key in (placement[0], resolve(placement[1]))
+        if isinstance(key, int)
+    }
+    result = await session.execute(
+        select(ScriptLine.id, ScriptLine.order).where(
+            ScriptLine.document_id == document_id, ScriptLine.id.in_(referenced)
+        )
+    )
+    layout = LineOrder(result.all(), fetch)
+    for item in diff.orders:
+        layout.assign(item.id, item.order)
+    for line in diff.created:
+        if line.order is not None:
+            layout.assign(line.temp_id, line.order)
+
+    for key, after_id in placements:
+        after = resolve(after_id)
+        if isinstance(key, int) and key not in layout:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Script line {key} not found",
+            )
+        if after is not None and (after == key or after not in layout):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid after_id: {after_id}",
+            )
+        await layout.place(key, after)
+    return layout
@@ -0,0 +1,312 @@
+import asyncio
+import contextvars
+import hashlib
+import json
+import tempfile
+import time
+import uuid
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from functools import partial
+from typing import AsyncIterable, Literal
+from urllib.parse import quote
+
+from botocore.exceptions import BotoCoreError, ClientError
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core import get_s3_client, run_in_s3_pool, settings
+from app.models.category import Category
+from app.models.document import Document
+from app.schemas import ExportCreate
+from app.services.documents import make_zip_entry
+from app.utils import (
+    DOCX_TYPE,
+    MEDIA_TYPES,
+    MERGED_ORDER,
+    SPOOL_BYTES,
+    export_rows_query,
+    generate_presigned_url,
+    make_docx,
+    make_merged_docx,
+    map_bounded,
+    stream_merged_docx,
+    stream_transcript,
+    stream_transcript_zip,
+    stream_zip,
+)
+
+JobStatus = Literal["queued", "running", "completed", "failed"]
+
+S3_DELETE_BATCH = 1000  # keys per DeleteObjects request (S3 limit)
+
+# failures a job reports as `error` (anything else is a bug: logged by the task)
+EXPORT_ERRORS = (
+    HTTPException,
+    SQLAlchemyError,
+    BotoCoreError,
+    ClientError,
+    BrokenProcessPool,
+    OSError,
+    ValueError,
+)
+
+
+@dataclass(eq=False)
+class ExportJob:
+    id: str
+    key: str  # request hash (kind, ids, engine, content version)
+    request: ExportCreate
+    bind: AsyncEngine  # engine of the submitting request (primary / replica)
+    status: JobStatus = "queued"
+    done: int = 0
+    total: int = 0
+    object_key: str | None = None
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+
+
+# In-memory job registry (per process), finished jobs are kept for export_job_ttl
+# single worker process only: a poll served by another worker does not see the job (404),
+# several workers need sticky routing or a shared registry
+_jobs: dict[str, ExportJob] = {}
+_jobs_by_key: dict[str, ExportJob] = {}
+_tasks: set[asyncio.Task] = set()
+_workers = asyncio.Semaphore(settings.export_workers)
+_expired_objects: list[str] = []  # uploads of pruned jobs, not deleted yet
+
+
+def _payload(job: ExportJob) -> dict:
+    return {
+        "id": job.id,
+        "kind": job.request.kind,
+        "ids": job.request.ids,
+        "status": job.status,
+        "progress": {"done": job.done, "total": job.total},
+        "url": generate_presigned_url(job.object_key),
+        "error": job.error,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+    }
+
+
+async def _prune():
+    expired_at = time.time() - settings.export_job_ttl
+    for job in [
+        j for j in _jobs.values() if j.finished_at and j.finished_at < expired_at
+    ]:
+        del _jobs[job.id]
+        if _jobs_by_key.get(job.key) is job:
+            del _jobs_by_key[job.key]
+        if job.object_key:
+            _expired_objects.append(job.object_key)
+
+    # uploaded files of the dropped jobs, keys that could not be deleted are retried
+    if _expired_objects:
+        keys = _expired_objects.copy()
+        _expired_objects.clear()
+        try:
+            failed = await run_in_s3_pool(_delete_objects, keys)
+        except (BotoCoreError, ClientError):
+            failed = keys
+        _expired_objects.extend(failed)
+
+
+# Runs in the S3 pool, returns the keys that were not deleted
+def _delete_objects(keys: list[str]) -> list[str]:
+    failed = []
+    for i in range(0, len(keys), S3_DELETE_BATCH):
+        response = get_s3_client().delete_objects(
+            Bucket=settings.s3_bucket,
+            Delete={
+                "Objects": [{"Key": key} for key in keys[i : i + S3_DELETE_BATCH]],
+                "Quiet": True,
+            },
+        )
+        failed += [error["Key"] for error in response.get("Errors", [])]
+    return failed
+
+
+# 404 for unknown ids, otherwise a digest of the (id, version) of the exported documents
+# (part of the dedup key: every edit bumps the version and starts a new job)
+async def _content_version(request: ExportCreate, session: AsyncSession) -> str:
+    model = Document if request.kind == "documents" else Category
+    result = await session.execute(select(model.id).where(model.id.in_(request.ids)))
+    missing = set(request.ids) - set(result.scalars().all())
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{model.__name__} {min(missing)} not found",
+        )
+
+    column = Document.id if request.kind == "documents" else Document.category_id
+    result = await session.execute(
+        select(Document.id, Document.version)
+        .where(column.in_(request.ids))
+        .order_by(Document.id)
+    )
+    return hashlib.sha256(
+        json.dumps([tuple(row) for row in result]).encode()
+    ).hexdigest()
+
+
+async def create_export(request: ExportCreate, session: AsyncSession) -> dict:
+    await _prune()
+    request.ids = sorted(set(request.ids))
+    request.engine = request.engine or settings.docx_engine
+    version = await _content_version(request, session)
+    key = hashlib.sha256(
+        json.dumps([request.model_dump(), version]).encode()
+    ).hexdigest()
+
+    # same request while queued / running / done -> same job
+    job = _jobs_by_key.get(key)
+    if job and job.status != "failed":
+        return _payload(job)
+
+    job = ExportJob(id=uuid.uuid4().hex, key=key, request=request, bind=session.bind)
+    _jobs[job.id] = job
+    _jobs_by_key[key] = job
+    # fresh context: the job's queries are not counted against the submitting request
+    task = asyncio.create_task(_run(job), context=contextvars.Context())
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return _payload(job)
+
+
+def get_export(job_id: str) -> dict:
+    job = _jobs.get(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export job not found",
+        )
+    return _payload(job)
+
+
+# Stop running exports on shutdown
+async def cancel_exports():
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+
+
+async def _run(job: ExportJob):
+    async with _workers:  # at most export_workers jobs build at once
+        job.status = "running"
+        try:
+            with tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES) as file:
+                filename, content_type = await _build(job, file)
+                job.object_key = f"exports/{job.id}/{filename}"
+                await asyncio.to_thread(file.seek, 0)
+                await run_in_s3_pool(
+                    _upload, file, job.object_key, filename, content_type
+                )
+            job.done += 1  # upload step
+            job.status = "completed"
+        except EXPORT_ERRORS as e:
+            job.object_key = None
+            job.error = str(e) or type(e).__name__
+            job.status = "failed"
+        finally:
+            if job.status == "running":  # cancelled or an unexpected error
+                job.object_key = None
+                job.error = "Export interrupted"
+                job.status = "failed"
+            job.finished_at = time.time()
+
+
+# Runs in the S3 pool (the client is built there on first use, not on the loop)
+def _upload(file, object_key: str, filename: str, content_type: str):
+    get_s3_client().upload_fileobj(
+        file,
+        settings.s3_bucket,
+        object_key,
+        ExtraArgs={
+            "ContentType": content_type,
+            "ContentDisposition": f"attachment; filename*=UTF-8''{quote(filename)}",
+        },
+    )
+
+
+# Render the export into `file`, returns (filename, content type)
+async def _build(job: ExportJob, file) -> tuple[str, str]:
+    request = job.request
+    if request.format != "docx":
+        return await _build_transcripts(job, file)
+
+    if request.kind == "categories":
+        job.total = 2  # render + upload
+        if request.engine == "stream":
+            # constant memory: the spooled file takes the package as it is written
+            async for chunk in stream_merged_docx(request.ids, job.bind):
+                await _write(file, chunk)
+        else:
+            async with AsyncSession(job.bind, expire_on_commit=False) as session:
+                buffer = await make_merged_docx(request.ids, session, request.engine)
+            await _write(file, buffer.getbuffer())
+        job.done += 1
+        return "merged.docx", DOCX_TYPE
+
+    job.total = len(request.ids) + 1  # documents + upload
+    if len(request.ids) == 1:
+        async with AsyncSession(job.bind, expire_on_commit=False) as session:
+            title, buffer = await make_docx(request.ids[0], session, request.engine)
+        await _write(file, buffer.getbuffer())
+        job.done += 1
+        return f"{title}.docx", DOCX_TYPE
+
+    files = map_bounded(
+        partial(make_zip_entry, bind=job.bind, engine=request.engine),
+        request.ids,
+        settings.export_concurrency,
+    )
+    async for chunk in stream_zip(_counted(job, files), "docx"):
+        await _write(file, chunk)
+    return "documents.zip", "application/zip"
+
+
+# txt / srt / vtt, same files as the download endpoints, written from the cursor
+async def _build_transcripts(job: ExportJob, file) -> tuple[str, str]:
+    request = job.request
+    job.total = 2  # export + upload
+    if request.kind == "categories":
+        query = export_rows_query(Document.category_id.in_(request.ids), *MERGED_ORDER)
+        single = request.format == "txt"
+        filename = "merged.txt" if single else "subtitles.zip"
+    else:
+        query = export_rows_query(Document.id.in_(request.ids))
+        single = len(request.ids) == 1
+        filename = "documents.zip"
+        if single:
+            async with AsyncSession(job.bind) as session:
+                result = await session.execute(
+                    select(Document.title).where(Document.id == request.ids[0])
+                )
+            title = result.scalar_one().replace(".txt", "")
+            filename = f"{title}.{request.format}"
+
+    if single:
+        chunks = stream_transcript(query, job.bind, request.format)
+        content_type = MEDIA_TYPES[request.format]
+    else:
+        chunks = stream_transcript_zip(query, job.bind, request.format)
+        content_type = "application/zip"
+    async for chunk in chunks:
+        await _write(file, chunk)
+    job.done += 1
+    return filename, content_type
+
+
+# spooled file I/O (may hit the disk above SPOOL_BYTES) runs off the loop
+async def _write(file, data):
+    await asyncio.to_thread(file.write, data)
+
+
+async def _counted(job: ExportJob, files: AsyncIterable[tuple[int, str, bytes]]):
+    async for entry in files:
+        job.done += 1
+        yield entry
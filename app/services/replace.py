@@ -0,0 +1,198 @@
+import re
+import time
+from datetime import datetime, timezone
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import run_in_regex_pool, settings
+from app.models.document import Document
+from app.models.script_line import ScriptLine
+from app.schemas import ScriptLineReplace
+from app.utils import render_cache, update_by_id
+
+REWRITE_CHUNK = 1000  # lines per CASE update of a regex replace
+
+# backends whose REGEXP narrows the scan before Python re runs, bounded server side
+# (MySQL regexp_time_limit; SQLite's REGEXP is unbounded Python re on the DB thread)
+REGEXP_DIALECTS = ("mysql", "mariadb")
+
+
+# Lines of the document / category / speaker
+def _in_scope(request: ScriptLineReplace):
+    if request.scope == "document":
+        return ScriptLine.document_id == request.scope_id
+    if request.scope == "category":
+        return ScriptLine.document_id.in_(
+            select(Document.id).where(Document.category_id == request.scope_id)
+        )
+    return ScriptLine.speaker_id == request.scope_id
+
+
+# Find and replace in every line of the scope, preview only counts the matches
+# plain text: one set-based UPDATE ... SET text = REPLACE(text, find, replace)
+# regex: lines are matched with Python re in the regex workers, only the matching
+# lines are locked and rewritten (chunked CASE updates)
+async def replace_script_lines(request: ScriptLineReplace, session: AsyncSession):
+    if request.regex:
+        changes = await _regex_changes(request, session)
+    else:
+        changes = await _plain_changes(request, session)
+
+    document_ids = sorted({document_id for document_id, _, _ in changes.values()})
+    result = {
+        "preview": request.preview,
+        "lines": len(changes),
+        "occurrences": sum(count for _, count, _ in changes.values()),
+        "line_ids": list(changes),
+        "document_ids": document_ids,
+    }
+    if request.preview or not changes:
+        return result
+
+    if not request.regex:  # regex changes are already written
+        await session.execute(
+            update(ScriptLine)
+            .where(ScriptLine.id.in_(list(changes)))
+            .values(text=func.replace(ScriptLine.text, request.find, request.replace))
+        )
+
+    # same as a sync: new version of every touched document, rendered files dropped
+    await session.execute(
+        update(Document)
+        .where(Document.id.in_(document_ids))
+        .values(version=Document.version + 1, updated_at=datetime.now(timezone.utc))
+    )
+    await session.commit()
+    for document_id in document_ids:
+        await render_cache.invalidate(document_id)
+
+    return result
+
+
+# line id -> (document id, occurrences, new text: None, REPLACE() runs in SQL)
+async def _plain_changes(
+    request: ScriptLineReplace, session: AsyncSession
+) -> dict[int, tuple[int, int, str | None]]:
+    # occurrences = removed length / find length (REPLACE is case sensitive, unlike LIKE)
+    removed = func.length(ScriptLine.text) - func.length(
+        func.replace(ScriptLine.text, request.find, "")
+    )
+    occurrences = removed / func.length(request.find)
+
+    query = (
+        select(ScriptLine.id, ScriptLine.document_id, occurrences)
+        .where(_in_scope(request), removed > 0)
+        .order_by(ScriptLine.id)
+    )
+    if not request.preview:
+        query = query.with_for_update()  # rows stay as counted until the UPDATE
+
+    result = await session.execute(query)
+    return {
+        line_id: (document_id, int(count), None)
+        for line_id, document_id, count in result
+    }
+
+
+async def _regex_changes(
+    request: ScriptLineReplace, session: AsyncSession
+) -> dict[int, tuple[int, int, str | None]]:
+    try:
+        re.compile(request.find)
+    except re.error as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid regex: {e}",
+        )
+    deadline = time.monotonic() + settings.replace_regex_timeout
+
+    # 1. find the matching lines, nothing locked, only ids and counts are kept
+    try:
+        matches = await _regex_matches(request, session, deadline, prefilter=True)
+    except DBAPIError:  # pattern the database's REGEXP does not accept
+        matches = await _regex_matches(request, session, deadline, prefilter=False)
+    if request.preview or not matches:
+        return matches
+
+    # 2. lock and rewrite only those lines, chunk by chunk (current text re-matched)
+    changes = {}
+    line_ids = sorted(matches)
+    for i in range(0, len(line_ids), REWRITE_CHUNK):
+        result = await session.execute(
+            select(ScriptLine.id, ScriptLine.document_id, ScriptLine.text)
+            .where(ScriptLine.id.in_(line_ids[i : i + REWRITE_CHUNK]))
+            .order_by(ScriptLine.id)
+            .with_for_update()
+        )
+        rows = result.all()
+        substituted = await _substitute(request, rows, deadline)
+        await update_by_id(
+            session,
+            ScriptLine,
+            {line_id: {"text": new_text} for line_id, _, new_text in substituted},
+        )
+        document_ids = {line_id: document_id for line_id, document_id, _ in rows}
+        for line_id, count, _ in substituted:
+            changes[line_id] = (document_ids[line_id], count, None)
+    return changes
+
+
+async def _regex_matches(
+    request: ScriptLineReplace,
+    session: AsyncSession,
+    deadline: float,
+    prefilter: bool,
+) -> dict[int, tuple[int, int, str | None]]:
+    query = (
+        select(ScriptLine.id, ScriptLine.document_id, ScriptLine.text)
+        .where(_in_scope(request))
+        .order_by(ScriptLine.id)
+    )
+    if prefilter and session.bind.dialect.name in REGEXP_DIALECTS:
+        query = query.where(ScriptLine.text.regexp_match(request.find))
+
+    matches = {}
+    result = await session.stream(query.execution_options(yield_per=REWRITE_CHUNK))
+    async for rows in result.partitions():
+        document_ids = {line_id: document_id for line_id, document_id, _ in rows}
+        for line_id, count, _ in await _substitute(request, rows, deadline):
+            matches[line_id] = (document_ids[line_id], count, None)
+    return matches
+
+
+# Substitutions of one chunk in a regex worker, bounded by the request's deadline
+# (a pathological pattern gets its worker process killed, not a render worker stuck)
+async def _substitute(
+    request: ScriptLineReplace, rows, deadline: float
+) -> list[tuple[int, int, str]]:
+    texts = [(line_id, text) for line_id, _, text in rows]
+    try:
+        return await run_in_regex_pool(
+            deadline, substitute_lines, request.find, request.replace, texts
+        )
+    except TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Regex replace took longer than {settings.replace_regex_timeout}s",
+        )
+    except (re.error, IndexError) as e:  # bad group reference in replace
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid replacement: {e}",
+        )
+
+
+# Runs in a regex worker process: (line id, occurrences, new text) of changed lines
+def substitute_lines(
+    find: str, replace: str, texts: list[tuple[int, str]]
+) -> list[tuple[int, int, str]]:
+    pattern = re.compile(find)
+    changed = []
+    for line_id, text in texts:
+        new_text, count = pattern.subn(replace, text)
+        if count and new_text != text:
+            changed.append((line_id, count, new_text))
+    return changed
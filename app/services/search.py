@@ -0,0 +1,45 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.document import Document
+from app.models.script_line import ScriptLine
+from app.services.documents import DOCUMENT_COLUMNS
+from app.utils import fetch_dicts, text_matches
+
+
+# Search titles and transcript text, line hits carry order/start_time for the editor
+async def search_documents(
+    q: str,
+    session: AsyncSession,
+    category_id: int | None = None,
+    limit: int = 50,
+):
+    documents_query = select(*DOCUMENT_COLUMNS).where(
+        text_matches(session, Document.title, q)
+    )
+    lines_query = select(
+        ScriptLine.id,
+        ScriptLine.document_id,
+        ScriptLine.order,
+        ScriptLine.start_time,
+        ScriptLine.text,
+    ).where(text_matches(session, ScriptLine.text, q))
+
+    if category_id is not None:
+        documents_query = documents_query.where(Document.category_id == category_id)
+        lines_query = lines_query.join(Document).where(
+            Document.category_id == category_id
+        )
+
+    documents = await fetch_dicts(session, documents_query.limit(limit))
+    # no ORDER BY: it would filesort every FULLTEXT hit before the LIMIT,
+    # the limited page is sorted here instead (latency independent of hit count)
+    lines = await session.execute(lines_query.limit(limit))
+
+    return {
+        "documents": documents,
+        "lines": sorted(
+            lines.mappings().all(),
+            key=lambda line: (line["document_id"], line["order"]),
+        ),
+    }
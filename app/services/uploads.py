@@ -0,0 +1,152 @@
+import asyncio
+import uuid
+from datetime import datetime
+from pathlib import PurePosixPath
+from typing import AsyncIterable
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import get_s3_client, run_in_s3_pool, settings
+from app.models.category import Category
+from app.models.document import Document
+from app.services.documents import DOCUMENT_COLUMNS
+from app.utils import category_stats_cache, fetch_dicts
+
+
+# Stream the request body to S3 as a multipart upload, then create its document
+# memory: one part (upload_part_size) at a time, file_size is counted on the way
+# no database connection is held while the body is streamed
+# the object is removed again when the document row cannot be committed
+async def upload_audio(
+    body: AsyncIterable[bytes],
+    session: AsyncSession,
+    category_id: int,
+    title: str | None,
+    recorded_date: str,
+    recorded_time: str,
+    filename: str,
+    content_type: str | None = None,
+):
+    result = await session.execute(
+        select(Category.id).where(Category.id == category_id)
+    )
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Category {category_id} not found",
+        )
+
+    try:  # checked before any byte is uploaded (headings parse it on export)
+        datetime.strptime(f"{recorded_date}{recorded_time}", "%y%m%d%H%M%S")
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid recorded_date / recorded_time",
+        )
+
+    # end the check's transaction: no pooled connection is held during the upload,
+    # the insert below takes one again
+    await session.rollback()
+
+    name = PurePosixPath(filename).name or "audio"  # no directories from the client
+    object_key = f"audio/{uuid.uuid4().hex}/{name}"
+    file_size = await _stream_to_s3(body, object_key, content_type)
+
+    document = Document(
+        category_id=category_id,
+        title=title or PurePosixPath(name).stem,
+        audio_url=object_key,
+        file_size=file_size,
+        recorded_date=recorded_date,
+        recorded_time=recorded_time,
+    )
+    session.add(document)
+    try:
+        await session.commit()
+    except BaseException:
+        await asyncio.shield(
+            _s3_call("delete_object", Bucket=settings.s3_bucket, Key=object_key)
+        )
+        raise
+    category_stats_cache.invalidate()  # document count / total size
+
+    documents = await fetch_dicts(
+        session, select(*DOCUMENT_COLUMNS).where(Document.id == document.id)
+    )
+    return documents[0]
+
+
+# boto3 call on the S3 pool (the client is built there on first use, not on the loop)
+async def _s3_call(method: str, **kwargs):
+    return await run_in_s3_pool(lambda: getattr(get_s3_client(), method)(**kwargs))
+
+
+# Returns the uploaded size, the multipart upload is aborted on any error
+async def _stream_to_s3(
+    body: AsyncIterable[bytes], object_key: str, content_type: str | None
+) -> int:
+    extra = {"ContentType": content_type} if content_type else {}
+    upload = await _s3_call(
+        "create_multipart_upload",
+        Bucket=settings.s3_bucket,
+        Key=object_key,
+        **extra,
+    )
+    upload_id = upload["UploadId"]
+    parts: list[dict] = []
+
+    async def upload_part(data: bytes):
+        part = await _s3_call(
+            "upload_part",
+            Bucket=settings.s3_bucket,
+            Key=object_key,
+            UploadId=upload_id,
+            PartNumber=len(parts) + 1,
+            Body=data,
+        )
+        parts.append({"PartNumber": len(parts) + 1, "ETag": part["ETag"]})
+
+    try:
+        size = 0
+        buffer = bytearray()
+        async for chunk in body:
+            size += len(chunk)
+            if size > settings.upload_max_bytes:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Upload is larger than {settings.upload_max_bytes} bytes",
+                )
+            buffer += chunk
+            while len(buffer) >= settings.upload_part_size:
+                await upload_part(bytes(buffer[: settings.upload_part_size]))
+                del buffer[: settings.upload_part_size]
+
+        if size == 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Empty upload",
+            )
+        if buffer:
+            await upload_part(bytes(buffer))  # last part may be smaller than 5MB
+
+        await _s3_call(
+            "complete_multipart_upload",
+            Bucket=settings.s3_bucket,
+            Key=object_key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": parts},
+        )
+        return size
+    except BaseException:
+        # shielded: a disconnected client cancels the request task
+        await asyncio.shield(
+            _s3_call(
+                "abort_multipart_upload",
+                Bucket=settings.s3_bucket,
+                Key=object_key,
+                UploadId=upload_id,
+            )
+        )
+        raise
@@ -1,3 +1,34 @@
-from .docx import make_docx, make_merged_docx
-from .s3 import generate_presigned_url
-from .zip import make_zip
+from .bulk import insert_returning_ids, update_by_id
+from .cache import category_stats_cache, render_cache
+from .concurrency import map_bounded
+from .docx import (
+    DOCX_TYPE,
+    DocxEngine,
+    load_docx_content,
+    make_docx,
+    make_merged_docx,
+    render_docx,
+    stream_merged_docx,
+)
+from .etag import check_if_match, etag_matches, make_etag, presign_period
+from .loaders import (
+    DOCUMENT_GRAPH,
+    MERGED_ORDER,
+    export_rows_query,
+    load_category_documents,
+    load_document,
+)
+from .ordering import LineOrder
+from .pagination import check_cursor_fields, decode_cursor, encode_cursor
+from .s3 import generate_presigned_url, generate_presigned_urls
+from .search import NGRAM_TOKEN_SIZE, text_matches
+from .serialize import dto_columns, fetch_dicts
+from .spool import SPOOL_BYTES, iter_spooled, spool
+from .transcript import (
+    MEDIA_TYPES,
+    ExportFormat,
+    TranscriptFormat,
+    stream_transcript,
+    stream_transcript_zip,
+)
+from .zip import entry_name, stream_zip
@@ -0,0 +1,65 @@
+from typing import Any
+
+from sqlalchemy import case, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import Base
+
+
+# Insert rows with a single statement, return the generated ids in row order
+async def insert_returning_ids(
+    session: AsyncSession,
+    model: type[Base],
+    rows: list[dict[str, Any]],
+) -> list[int]:
+    if not rows:
+        return []
+
+    table = model.__table__
+    dialect = session.get_bind().dialect
+    if dialect.insert_executemany_returning_sort_by_parameter_order:
+        result = await session.execute(
+            insert(table).returning(table.c.id, sort_by_parameter_order=True), rows
+        )
+        return list(result.scalars())
+
+    # MySQL has no RETURNING: a multi-row INSERT is a "simple insert" for InnoDB,
+    # its auto increment ids are consecutive from LAST_INSERT_ID() (auto_increment_increment = 1)
+    result = await session.execute(insert(table).values(rows))
+    first_id = result.lastrowid
+    return list(range(first_id, first_id + len(rows)))
+
+
+# Update many rows with different values in a single statement
+# UPDATE ... SET col = CASE id WHEN ... THEN ... ELSE col END WHERE id IN (...)
+async def update_by_id(
+    session: AsyncSession,
+    model: type[Base],
+    values_by_id: dict[int, dict[str, Any]],
+):
+    if not values_by_id:
+        return
+
+    table = model.__table__
+    columns = {name for values in values_by_id.values() for name in values}
+    if not columns:
+        return
+
+    await session.execute(
+        update(table)
+        .where(table.c.id.in_(values_by_id))
+        .values(
+            {
+                name: case(
+                    {
+                        row_id: values[name]
+                        for row_id, values in values_by_id.items()
+                        if name in values
+                    },
+                    value=table.c.id,
+                    else_=table.c[name],
+                )
+                for name in columns
+            }
+        )
+    )
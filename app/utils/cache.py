@@ -0,0 +1,174 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Generic, TypeVar
+
+from app.core import settings
+
+CacheKey = tuple[int, str]  # (document id, content version)
+T = TypeVar("T")
+
+
+# Rendered file cache: memory LRU with a byte budget,
+# entries evicted from memory spill to a local directory (also LRU with a byte budget)
+# bookkeeping stays on the loop, spill file I/O is queued and run in a thread
+# (one operation at a time, so a file is never read while it is replaced)
+class RenderCache:
+    def __init__(self, memory_bytes: int, disk_bytes: int, directory: Path):
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.directory = directory
+
+        self._memory: OrderedDict[CacheKey, bytes] = OrderedDict()
+        self._memory_size = 0
+        self._disk: OrderedDict[CacheKey, int] = OrderedDict()  # key -> file size
+        self._disk_size = 0
+        self._spill_dir: Path | None = None  # created on first spill, one per process
+        self._pending: list[tuple[CacheKey, bytes | None]] = []  # write / unlink
+        self._lock = asyncio.Lock()
+
+    async def get(self, document_id: int, version: str) -> bytes | None:
+        key = (document_id, version)
+        if key in self._memory:  # no I/O, no need to wait for the lock
+            self._memory.move_to_end(key)
+            return self._memory[key]
+
+        async with self._lock:
+            if key in self._memory:  # promoted while waiting
+                self._memory.move_to_end(key)
+                return self._memory[key]
+            if key not in self._disk:
+                return None
+
+            data = await asyncio.to_thread(self._path(key).read_bytes)
+            self._remove_disk(key)
+            self._put_memory(key, data)  # promote back to memory
+            await self._flush()
+            return data
+
+    async def put(self, document_id: int, version: str, data: bytes):
+        key = (document_id, version)
+        async with self._lock:
+            self._remove_memory(key)
+            self._remove_disk(key)
+            self._put_memory(key, data)
+            await self._flush()
+
+    # drop every version of the document
+    async def invalidate(self, document_id: int):
+        async with self._lock:
+            for key in [k for k in self._memory if k[0] == document_id]:
+                self._remove_memory(key)
+            for key in [k for k in self._disk if k[0] == document_id]:
+                self._remove_disk(key)
+            await self._flush()
+
+    async def clear(self):
+        async with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+            self._disk.clear()
+            self._disk_size = 0
+            self._pending.clear()
+            if self._spill_dir:
+                await asyncio.to_thread(
+                    shutil.rmtree, self._spill_dir, ignore_errors=True
+                )
+                self._spill_dir = None
+
+    def _put_memory(self, key: CacheKey, data: bytes):
+        if len(data) > self.memory_bytes:
+            self._put_disk(key, data)
+            return
+
+        self._memory[key] = data
+        self._memory_size += len(data)
+        while self._memory_size > self.memory_bytes:
+            old_key, old_data = self._memory.popitem(last=False)  # least recently used
+            self._memory_size -= len(old_data)
+            self._put_disk(old_key, old_data)
+
+    def _put_disk(self, key: CacheKey, data: bytes):
+        if len(data) > self.disk_bytes:
+            return
+
+        while self._disk and self._disk_size + len(data) > self.disk_bytes:
+            self._remove_disk(next(iter(self._disk)))  # least recently used
+
+        self._pending.append((key, data))
+        self._disk[key] = len(data)
+        self._disk_size += len(data)
+
+    def _remove_memory(self, key: CacheKey):
+        data = self._memory.pop(key, None)
+        if data is not None:
+            self._memory_size -= len(data)
+
+    def _remove_disk(self, key: CacheKey):
+        size = self._disk.pop(key, None)
+        if size is not None:
+            self._disk_size -= size
+            self._pending.append((key, None))
+
+    # run the queued writes / unlinks in order, called with the lock held
+    async def _flush(self):
+        pending, self._pending = self._pending, []
+        if pending:
+            await asyncio.to_thread(self._apply, pending)
+
+    def _apply(self, pending: list[tuple[CacheKey, bytes | None]]):
+        for key, data in pending:
+            if data is None:
+                self._path(key).unlink(missing_ok=True)
+            else:
+                self._path(key).write_bytes(data)
+
+    def _path(self, key: CacheKey) -> Path:
+        if self._spill_dir is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._spill_dir = Path(
+                tempfile.mkdtemp(prefix=f"{os.getpid()}-", dir=self.directory)
+            )
+        document_id, version = key
+        return self._spill_dir / f"{document_id}-{version.encode().hex()}"
+
+
+render_cache = RenderCache(
+    memory_bytes=settings.render_cache_memory_bytes,
+    disk_bytes=settings.render_cache_disk_bytes,
+    directory=settings.render_cache_dir,
+)
+
+
+# Single value kept for `ttl` seconds, or until invalidate() after a write
+# loaders read `generation` before loading and pass it to set(): a load that was
+# in flight when invalidate() ran is dropped instead of caching pre-write data
+class TTLValue(Generic[T]):
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.generation = 0
+        self._value: T | None = None
+        self._expires_at = 0.0
+
+    def get(self) -> T | None:
+        if time.monotonic() >= self._expires_at:
+            return None
+        return self._value
+
+    def set(self, value: T, generation: int):
+        if generation != self.generation:
+            return
+        self._value = value
+        self._expires_at = time.monotonic() + self.ttl
+
+    def invalidate(self):
+        self.generation += 1
+        self._value = None
+        self._expires_at = 0.0
+
+
+category_stats_cache: TTLValue[list[dict]] = TTLValue(settings.category_stats_ttl)
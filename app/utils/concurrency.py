@@ -0,0 +1,36 @@
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Iterable, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+# Run fn for each item with at most `limit` tasks in flight,
+# yield results in completion order (pending tasks are cancelled on early exit)
+async def map_bounded(
+    fn: Callable[[T], Awaitable[R]],
+    items: Iterable[T],
+    limit: int,
+) -> AsyncIterator[R]:
+    items = iter(items)
+    pending: set[asyncio.Task] = set()
+
+    def schedule() -> bool:
+        for item in items:
+            pending.add(asyncio.create_task(fn(item)))
+            return True
+        return False
+
+    try:
+        while len(pending) < limit and schedule():
+            pass
+
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                pending.discard(task)
+                schedule()  # keep the pipeline full before handing out the result
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
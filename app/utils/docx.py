@@ -1,27 +1,61 @@
 import io
+from dataclasses import dataclass
 from datetime import datetime
+from typing import TYPE_CHECKING, AsyncIterator, Literal
 
-from docx import Document as DocxDocument
-from docx.oxml import OxmlElement
-from docx.oxml.ns import qn
-from docx.shared import Twips
 from fastapi import HTTPException, status
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
+from app.core import metrics, run_in_render_pool, settings
 from app.models.document import Document
-from app.models.script_line import ScriptLine
-from app.models.speaker import Speaker
+from app.utils.cache import render_cache
+from app.utils.docx_writer import DocxWriter
+from app.utils.loaders import (
+    MERGED_ORDER,
+    export_rows_query,
+    load_category_documents,
+    load_document,
+)
+from app.utils.zip import ZipSink
 
+if TYPE_CHECKING:
+    from docx.document import Document as DocxDocument
+
+DocxEngine = Literal["python-docx", "stream"]  # object tree / streamed document.xml
+
+DOCX_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+MERGE_CHUNK = 1000  # rows per fetch of the merged export cursor
+
+
+# Plain (picklable) document data sent to the rendering workers
+@dataclass(frozen=True, slots=True)
+class DocxContent:
+    recorded_date: str
+    recorded_time: str
+    speakers: dict[int, str]
+    lines: list[tuple[int | None, str | None, str]]  # (speaker_id, start_time, text)
+
+
+def to_docx_content(document: Document, speakers: dict, lines: list) -> DocxContent:
+    return DocxContent(
+        recorded_date=document.recorded_date,
+        recorded_time=document.recorded_time,
+        speakers=speakers,
+        lines=[(line.speaker_id, line.start_time, line.text) for line in lines],
+    )
+
+
+# python-docx is imported inside the rendering functions: they run in the
+# render pool, the API process never loads it
+def _add_content(doc: "DocxDocument", content: DocxContent):
+    from docx.oxml import OxmlElement
+    from docx.oxml.ns import qn
+    from docx.shared import Twips
 
-def _add_content(
-    doc: DocxDocument,
-    document: Document,
-    speakers: dict,
-    lines: list[ScriptLine],
-):
     dt = datetime.strptime(
-        f"{document.recorded_date}{document.recorded_time}", "%y%m%d%H%M%S"
+        f"{content.recorded_date}{content.recorded_time}", "%y%m%d%H%M%S"
     )
     formatted_datetime = dt.strftime("%y.%m.%d_%H:%M:%S")
 
@@ -30,8 +64,8 @@ def _add_content(
     date_run.bold = True
     date_run.underline = True
 
-    for line in lines:
-        speaker_name = speakers.get(line.speaker_id, "Unknown")
+    for speaker_id, start_time, text in content.lines:
+        speaker_name = content.speakers.get(speaker_id, "Unknown")
         para = doc.add_paragraph()
 
         # 탭 스탑 설정 (twips 단위, **직접 해보면서 조정 필요**)
@@ -51,82 +85,149 @@ def _add_content(
         para.paragraph_format.left_indent = Twips(1500)
         para.paragraph_format.first_line_indent = Twips(-1500)
 
-        if line.start_time:
-            para.add_run(f"{speaker_name}\t{line.start_time}\t{line.text}")
+        if start_time:
+            para.add_run(f"{speaker_name}\t{start_time}\t{text}")
         else:
-            para.add_run(f"{speaker_name}\t\t{line.text}")
+            para.add_run(f"{speaker_name}\t\t{text}")
 
 
-def format_docx(
-    document: Document,
-    speakers: dict,
-    lines: list[ScriptLine],
-) -> io.BytesIO:
-    doc = DocxDocument()
-    _add_content(doc, document, speakers, lines)
+def _save(doc: "DocxDocument") -> bytes:
     buffer = io.BytesIO()  # make empty buffer to save the document
     doc.save(buffer)  # save the document to the buffer
-    buffer.seek(0)  # set the pointer to the beginning of the buffer
-    return buffer
+    return buffer.getvalue()
 
 
-# TODO: has to be updated to single query with relationships later (next development + tuning phase)
-async def make_docx(document_id: int, session: AsyncSession) -> tuple[str, io.BytesIO]:
-    result = await session.execute(select(Document).where(Document.id == document_id))
-    document = result.scalar_one_or_none()
-    if not document:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Document {document_id} not found",
-        )
+# Same layout as _add_content, written straight into the package
+def _write_docx(contents: list[DocxContent]) -> bytes:
+    buffer = io.BytesIO()
+    writer = DocxWriter(buffer)
+    for i, content in enumerate(contents):
+        if i > 0:
+            writer.add_blank()
+        writer.add_heading(content.recorded_date, content.recorded_time)
+        for speaker_id, start_time, text in content.lines:
+            writer.add_line(
+                content.speakers.get(speaker_id, "Unknown"), start_time, text
+            )
+    writer.close()
+    return buffer.getvalue()
 
-    speakers_result = await session.execute(
-        select(Speaker).where(Speaker.document_id == document_id)
-    )
-    speakers = {s.id: s.name for s in speakers_result.scalars().all()}
 
-    lines_result = await session.execute(
-        select(ScriptLine)
-        .where(ScriptLine.document_id == document_id)
-        .order_by(ScriptLine.order)
-    )
-    lines = lines_result.scalars().all()
+# Runs in the rendering process pool
+def render_docx(content: DocxContent, engine: DocxEngine = "python-docx") -> bytes:
+    if engine == "stream":
+        return _write_docx([content])
 
-    title = document.title.replace(".txt", "")
-    buffer = format_docx(document, speakers, lines)
-    return title, buffer
+    from docx import Document as DocxDocument
+
+    doc = DocxDocument()
+    _add_content(doc, content)
+    return _save(doc)
 
 
-# TODO: has to be updated to single query with relationships later (next development + tuning phase)
-async def make_merged_docx(
-    category_ids: list[int], session: AsyncSession
-) -> io.BytesIO:
-    result = await session.execute(
-        select(Document)
-        .where(Document.category_id.in_(category_ids))
-        .order_by(Document.recorded_date.asc(), Document.recorded_time.asc())
-    )
-    documents = result.scalars().all()
+# Runs in the rendering process pool
+def render_merged_docx(
+    contents: list[DocxContent], engine: DocxEngine = "python-docx"
+) -> bytes:
+    if engine == "stream":
+        return _write_docx(contents)
+
+    from docx import Document as DocxDocument
 
     doc = DocxDocument()
-    for i, document in enumerate(documents):
+    for i, content in enumerate(contents):
         if i > 0:
             doc.add_paragraph("")
+        _add_content(doc, content)
+    return _save(doc)
+
+
+async def load_docx_content(
+    document_id: int, session: AsyncSession
+) -> tuple[str, DocxContent]:
+    document = await load_document(document_id, session)
+    speakers = {s.id: s.name for s in document.speakers}
+    content = to_docx_content(document, speakers, document.script_lines)
+
+    title = document.title.replace(".txt", "")
+    return title, content
 
-        speakers_result = await session.execute(
-            select(Speaker).where(Speaker.document_id == document.id)
-        )
-        speakers = {s.id: s.name for s in speakers_result.scalars().all()}
 
-        lines_result = await session.execute(
-            select(ScriptLine)
-            .where(ScriptLine.document_id == document.id)
-            .order_by(ScriptLine.order)
+# Rendered docx is served from the cache while the document is unchanged
+# (version: engine + Document.version, bumped by every sync_script_lines commit)
+async def make_docx(
+    document_id: int, session: AsyncSession, engine: DocxEngine | None = None
+) -> tuple[str, io.BytesIO]:
+    engine = engine or settings.docx_engine
+    result = await session.execute(
+        select(Document.title, Document.version).where(Document.id == document_id)
+    )
+    row = result.one_or_none()
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Document {document_id} not found",
         )
-        lines = lines_result.scalars().all()
-        _add_content(doc, document, speakers, lines)
 
-    buffer = io.BytesIO()
-    doc.save(buffer)
-    buffer.seek(0)
-    return buffer
+    title = row.title.replace(".txt", "")
+    version = f"{engine}:{row.version}"
+    data = await render_cache.get(document_id, version)
+    if data is None:
+        _, content = await load_docx_content(document_id, session)
+        data = await run_in_render_pool(render_docx, content, engine)
+        await render_cache.put(document_id, version, data)
+
+    return title, io.BytesIO(data)
+
+
+async def make_merged_docx(
+    category_ids: list[int], session: AsyncSession, engine: DocxEngine | None = None
+) -> io.BytesIO:
+    engine = engine or settings.docx_engine
+    documents = await load_category_documents(category_ids, session)
+    contents = [
+        to_docx_content(document, speakers, lines)
+        for document, speakers, lines in documents
+    ]
+
+    data = await run_in_render_pool(render_merged_docx, contents, engine)
+    # lower bound: the whole package is held
+    metrics.merged_export_peak_bytes.observe(engine, value=len(data))
+    return io.BytesIO(data)
+
+
+# Merged docx of the categories as a byte stream ("stream" engine)
+# one server-side cursor over the export rows in output order, paragraphs are
+# written as rows arrive and the package is yielded as it is compressed:
+# memory is bounded by MERGE_CHUNK rows, not by the number of documents
+# the cursor stays open until the stream is consumed: callers spool it (app.utils.spool)
+# instead of handing it to a client directly
+async def stream_merged_docx(
+    category_ids: list[int], bind: AsyncEngine
+) -> AsyncIterator[bytes]:
+    query = export_rows_query(
+        Document.category_id.in_(category_ids), *MERGED_ORDER
+    ).execution_options(yield_per=MERGE_CHUNK)
+
+    sink = ZipSink()
+    writer = DocxWriter(sink)
+    peak = sink.buffered
+    current = None
+    async with AsyncSession(bind) as session:
+        result = await session.stream(query)
+        async for rows in result.partitions():
+            for row in rows:
+                if row.id != current:
+                    if current is not None:
+                        writer.add_blank()
+                    writer.add_heading(row.recorded_date, row.recorded_time)
+                    current = row.id
+                if row.line_id is not None:
+                    writer.add_line(row.name or "Unknown", row.start_time, row.text)
+            peak = max(peak, sink.buffered + writer.buffered)
+            yield sink.drain()
+
+    writer.close()
+    peak = max(peak, sink.buffered)
+    metrics.merged_export_peak_bytes.observe("stream", value=peak)
+    yield sink.drain()
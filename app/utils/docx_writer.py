@@ -0,0 +1,112 @@
+import re
+import zipfile
+from datetime import datetime
+from functools import cache
+from importlib.util import find_spec
+from pathlib import Path
+from typing import IO
+from xml.sax.saxutils import escape
+
+# Paragraph style shared by every script line (tab stops + hanging indent, twips)
+SCRIPT_LINE_STYLE = (
+    '<w:style w:type="paragraph" w:customStyle="1" w:styleId="ScriptLine">'
+    '<w:name w:val="Script Line"/><w:basedOn w:val="Normal"/><w:qFormat/>'
+    "<w:pPr>"
+    '<w:tabs><w:tab w:val="left" w:pos="800"/><w:tab w:val="left" w:pos="1500"/></w:tabs>'
+    '<w:ind w:left="1500" w:hanging="1500"/>'
+    "</w:pPr>"
+    "</w:style>"
+)
+
+FLUSH_PARAGRAPHS = 512  # paragraphs buffered before a write into the zip entry
+
+_INVALID_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_RUN_SPECIAL = re.compile("(\t|\r\n|\n|\r)")
+
+
+# Parts of python-docx's default template (the same package python-docx would save)
+@cache
+def _template_parts() -> dict[str, bytes]:
+    spec = find_spec("docx")
+    path = Path(spec.submodule_search_locations[0]) / "templates" / "default.docx"
+    with zipfile.ZipFile(path) as template:
+        parts = {name: template.read(name) for name in template.namelist()}
+
+    parts["word/styles.xml"] = parts["word/styles.xml"].replace(
+        b"</w:styles>", SCRIPT_LINE_STYLE.encode() + b"</w:styles>"
+    )
+    return parts
+
+
+# document.xml around the paragraphs: (... <w:body>, <w:sectPr ...> ... </w:document>)
+@cache
+def _document_shell() -> tuple[bytes, bytes]:
+    document = _template_parts()["word/document.xml"]
+    body = document.index(b"<w:body>") + len(b"<w:body>")
+    section = document.index(b"<w:sectPr", body)
+    return document[:body], document[section:]
+
+
+# w:r content, tabs and line breaks become elements (same as python-docx's run.text)
+def _run(text: str) -> str:
+    parts = []
+    for piece in _RUN_SPECIAL.split(_INVALID_XML.sub("", text)):
+        if piece == "\t":
+            parts.append("<w:tab/>")
+        elif piece in ("\r\n", "\n", "\r"):
+            parts.append("<w:br/>")
+        elif piece:
+            parts.append(f'<w:t xml:space="preserve">{escape(piece)}</w:t>')
+    return "".join(parts)
+
+
+# Writes a .docx package into `fileobj`, document.xml is streamed paragraph by paragraph
+# (no object tree, tab stops and indent come from the ScriptLine style)
+class DocxWriter:
+    def __init__(self, fileobj: IO[bytes]):
+        self._zip = zipfile.ZipFile(fileobj, "w", zipfile.ZIP_DEFLATED)
+        head, self._tail = _document_shell()
+        for name, data in _template_parts().items():
+            if name != "word/document.xml":
+                self._zip.writestr(name, data)
+
+        self._document = self._zip.open("word/document.xml", "w", force_zip64=True)
+        self._document.write(head)
+        self._pending: list[bytes] = []
+        self.buffered = 0  # bytes of the paragraphs not yet written
+
+    def add_heading(self, recorded_date: str, recorded_time: str):
+        dt = datetime.strptime(f"{recorded_date}{recorded_time}", "%y%m%d%H%M%S")
+        formatted_datetime = dt.strftime("%y.%m.%d_%H:%M:%S")
+        self._add(
+            '<w:p><w:r><w:rPr><w:b/><w:u w:val="single"/></w:rPr>'
+            f"{_run(formatted_datetime)}</w:r></w:p>"
+        )
+
+    def add_line(self, speaker_name: str, start_time: str | None, text: str):
+        line = _run(f"{speaker_name}\t{start_time or ''}\t{text}")
+        self._add(
+            f'<w:p><w:pPr><w:pStyle w:val="ScriptLine"/></w:pPr><w:r>{line}</w:r></w:p>'
+        )
+
+    def add_blank(self):
+        self._add("<w:p/>")
+
+    def close(self):
+        self._flush()
+        self._document.write(self._tail)
+        self._document.close()
+        self._zip.close()
+
+    def _add(self, paragraph: str):
+        data = paragraph.encode()
+        self._pending.append(data)
+        self.buffered += len(data)
+        if len(self._pending) >= FLUSH_PARAGRAPHS:
+            self._flush()
+
+    def _flush(self):
+        if self._pending:
+            self._document.write(b"".join(self._pending))
+            self._pending.clear()
+            self.buffered = 0
@@ -0,0 +1,46 @@
+import time
+
+from fastapi import HTTPException, status
+
+from app.core import settings
+
+
+# Period of the detail response's ETag: it embeds a presigned url that is re-signed
+# after presign_refresh_ratio of its lifetime, a revalidated copy must not outlive it
+# (signed >= refresh ratio * lifetime ago, kept <= one period -> still valid)
+def presign_period() -> int:
+    lifetime = settings.presign_expires_in
+    return int(
+        time.time() // max(lifetime * (1 - settings.presign_refresh_ratio) / 2, 1)
+    )
+
+
+# Strong ETag of a document version (+ presign period for representations with urls)
+def make_etag(version: int, period: int | None = None) -> str:
+    if period is None:
+        return f'"{version}"'
+    return f'"{version}.{period}"'
+
+
+# If-None-Match / If-Match: "*" or a list of (weak) tags
+# without `period` only the version is compared (If-Match on writes)
+def etag_matches(header: str, version: int, period: int | None = None) -> bool:
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        tag_version, _, tag_period = tag.removeprefix("W/").strip('"').partition(".")
+        if tag_version != str(version):
+            continue
+        if period is None or tag_period == str(period):
+            return True
+    return False
+
+
+def check_if_match(if_match: str | None, version: int):
+    if if_match is not None and not etag_matches(if_match, version):
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Document has been modified",
+            headers={"ETag": make_etag(version)},
+        )
@@ -0,0 +1,109 @@
+from collections import defaultdict
+
+from fastapi import HTTPException, status
+from sqlalchemy import ColumnElement, Row, Select, and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.models.document import Document
+from app.models.script_line import ScriptLine
+from app.models.speaker import Speaker
+
+# Eager loading options for the whole document graph
+# speakers are joined into the document row (a few per document),
+# script lines come from a single IN query in the same execute()
+# (joining both collections would return speakers x lines rows)
+DOCUMENT_GRAPH = (
+    joinedload(Document.speakers),
+    selectinload(Document.script_lines),
+)
+
+# Merged exports list documents in recording order
+MERGED_ORDER = (Document.recorded_date, Document.recorded_time)
+
+
+# Load document with speakers and script lines (ordered)
+async def load_document(document_id: int, session: AsyncSession) -> Document:
+    result = await session.execute(
+        select(Document).where(Document.id == document_id).options(*DOCUMENT_GRAPH)
+    )
+    document = result.unique().scalar_one_or_none()
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Document {document_id} not found",
+        )
+    return document
+
+
+# Load every document of the categories with its speakers and script lines
+# 3 queries in total (documents, speakers, lines), grouped by document in memory
+async def load_category_documents(
+    category_ids: list[int], session: AsyncSession
+) -> list[tuple[Document, dict[int, str], list[Row]]]:
+    document_ids = select(Document.id).where(Document.category_id.in_(category_ids))
+
+    result = await session.execute(
+        select(Document)
+        .where(Document.category_id.in_(category_ids))
+        .order_by(Document.recorded_date.asc(), Document.recorded_time.asc())
+    )
+    documents = result.scalars().all()
+
+    speakers: dict[int, dict[int, str]] = defaultdict(dict)
+    speakers_result = await session.execute(
+        select(Speaker.document_id, Speaker.id, Speaker.name).where(
+            Speaker.document_id.in_(document_ids)
+        )
+    )
+    for document_id, speaker_id, name in speakers_result:
+        speakers[document_id][speaker_id] = name
+
+    # only the columns needed for export, no ORM objects
+    lines: dict[int, list[Row]] = defaultdict(list)
+    lines_result = await session.execute(
+        select(
+            ScriptLine.document_id,
+            ScriptLine.speaker_id,
+            ScriptLine.start_time,
+            ScriptLine.text,
+        )
+        .where(ScriptLine.document_id.in_(document_ids))
+        .order_by(ScriptLine.document_id, ScriptLine.order)
+    )
+    for line in lines_result:
+        lines[line.document_id].append(line)
+
+    return [
+        (document, speakers[document.id], lines[document.id]) for document in documents
+    ]
+
+
+# Flat export rows: every document of the condition followed by its lines in order
+# (one row per line, line_id is None for a document without lines), read through
+# a server-side cursor by the streaming exporters
+def export_rows_query(
+    condition: ColumnElement[bool], *document_order: ColumnElement
+) -> Select:
+    return (
+        select(
+            Document.id,
+            Document.title,
+            Document.recorded_date,
+            Document.recorded_time,
+            ScriptLine.id.label("line_id"),
+            ScriptLine.start_time,
+            ScriptLine.text,
+            Speaker.name,
+        )
+        .outerjoin(ScriptLine, ScriptLine.document_id == Document.id)
+        .outerjoin(
+            Speaker,
+            and_(
+                Speaker.id == ScriptLine.speaker_id,
+                Speaker.document_id == Document.id,
+            ),
+        )
+        .where(condition)
+        .order_by(*document_order, Document.id, ScriptLine.order)
+    )
@@ -0,0 +1,211 @@
+import bisect
+from typing import Awaitable, Callable, Iterable
+
+ORDER_GAP = 1024  # distance between neighbours when lines are appended or rebalanced
+MIN_SPACING = ORDER_GAP // 16  # rebalanced windows are at least this sparse
+LOAD_ROWS = 64  # rows read per neighbour query
+
+LineKey = int | str  # existing line id or temp_id of a created line
+LineRow = tuple[LineKey, int]
+# position of a line: (order, id) like the reads, created lines after equal orders
+LineSlot = tuple[int, int, int]
+
+# rows with low < order < high (None: unbounded), at most `limit` rows,
+# ascending or (descending=True) from the high end
+FetchRows = Callable[
+    [int | None, int | None, int | None, bool], Awaitable[Iterable[LineRow]]
+]
+
+INF = float("inf")
+
+
+# In-memory layout of a document's line orders (sparse integers)
+# placing a line takes the midpoint of its neighbours, only when the gap is exhausted
+# the lines around it are spread over a growing window (1, 2, 4, ... lines each side)
+# only the rows next to the placements are read: `covered` holds the order ranges
+# read completely, rows already seen keep their in-memory order
+class LineOrder:
+    def __init__(self, rows: Iterable[LineRow], fetch: FetchRows):
+        self.keys: list[LineKey] = []
+        self.slots: list[LineSlot] = []  # sorted, parallel to keys
+        self.index: dict[LineKey, int] = {}  # key -> order
+        self.temp_ids: dict[str, int] = {}  # temp_id -> rank (first seen first)
+        self.seen: set[LineKey] = set()
+        self.covered: list[list[float]] = []  # sorted, disjoint [low, high]
+        self.changed: dict[LineKey, int] = {}
+        self.fetch = fetch
+        for key, order in rows:
+            self._insert(key, order)
+
+    def __contains__(self, key: LineKey) -> bool:
+        return key in self.index
+
+    # absolute order from the client (legacy `orders` / `order`)
+    def assign(self, key: LineKey, order: int):
+        if key in self.index:
+            self._remove(key)
+        self._insert(key, order)
+        self.changed[key] = order
+
+    # put the line right after `after` (None: first line), returns the new order
+    async def place(self, key: LineKey, after: LineKey | None) -> int:
+        self.seen.add(key)  # its stored row is not read back while it is moved
+        if key in self.index:
+            self._remove(key)
+        following = await self._walk(after, 1)
+
+        lower = self.index[after] if after is not None else None
+        upper = self.index[following[0]] if following else None
+        if lower is None and upper is None:
+            order = ORDER_GAP
+        elif upper is None:
+            order = lower + ORDER_GAP
+        elif lower is None:
+            order = upper - ORDER_GAP
+        elif upper - lower >= 2:
+            order = (lower + upper) // 2
+        else:
+            return await self._spread(key, after)
+
+        self._insert(key, order)
+        self.changed[key] = order
+        return order
+
+    # make room between `after` and the next line: re-space `width` lines on each
+    # side between the lines just outside, the side that reaches the start / end
+    # of the document first gets plain gaps (a dense document pays once, on its
+    # shorter side)
+    async def _spread(self, key: LineKey, after: LineKey) -> int:
+        width = 1
+        while True:
+            tail = await self._walk(after, width + 1)
+            head = [after, *await self._walk(after, width, forward=False)]
+            if len(tail) <= width or len(head) <= width:
+                if len(tail) <= len(head):
+                    lower = self.index[after]
+                    orders = [
+                        lower + ORDER_GAP * slot for slot in range(1, len(tail) + 2)
+                    ]
+                    return self._respace(key, [key, *tail], orders)
+                upper = self.index[tail[0]]
+                orders = [
+                    upper - ORDER_GAP * slot for slot in range(len(head) + 1, 0, -1)
+                ]
+                return self._respace(key, [*reversed(head), key], orders)
+
+            lower = self.index[head[width]]
+            count = 2 * width + 1  # window lines + the placed one
+            spacing = (self.index[tail[width]] - lower) // (count + 1)
+            if spacing >= MIN_SPACING:
+                keys = [*reversed(head[:width]), key, *tail[:width]]
+                orders = [lower + spacing * slot for slot in range(1, count + 1)]
+                return self._respace(key, keys, orders)
+            width *= 2
+
+    # give `keys` (in line order, `key` is the one being placed) ascending `orders`
+    def _respace(self, key: LineKey, keys: list[LineKey], orders: list[int]) -> int:
+        positions = {k: self._position(k) for k in keys if k != key}
+        for k, order in zip(keys, orders):
+            if k == key:
+                placed = order
+            elif self.index[k] != order:
+                self.index[k] = order
+                self.slots[positions[k]] = self._slot(k)
+                self.changed[k] = order
+        self._insert(key, placed)
+        self.changed[key] = placed
+        return placed
+
+    # `count` lines next to `key` (None: from the start / end of the document),
+    # the rows between are read when their range is not covered yet
+    async def _walk(
+        self, key: LineKey | None, count: int, forward: bool = True
+    ) -> list[LineKey]:
+        if count == 0:
+            return []
+        while True:
+            if key is None:
+                start, i = (-INF, -1) if forward else (INF, len(self.keys))
+            else:
+                start, i = self.index[key], self._position(key)
+            if forward:
+                keys = self.keys[i + 1 : i + 1 + count]
+            else:
+                keys = self.keys[max(i - count, 0) : i][::-1]
+
+            edge = INF if forward else -INF  # fewer lines: up to the end
+            if len(keys) == count:
+                edge = self.index[keys[-1]]
+            if self._covers(start, edge):
+                return keys
+            await self._load(start, count, forward)
+
+    def _covers(self, a: float, b: float) -> bool:
+        low, high = min(a, b), max(a, b)
+        return any(lo <= low and high <= hi for lo, hi in self.covered)
+
+    # read the rows after (before) `start`, from the edge of its covered range
+    async def _load(self, start: float, count: int, forward: bool):
+        limit = max(count + 1, LOAD_ROWS)
+        contains = [r for r in self.covered if r[0] <= start <= r[1]]
+        if forward:
+            edge = contains[0][1] if contains else start - 1
+            rows = list(await self.fetch(_bound(edge), None, limit, False))
+        else:
+            edge = contains[0][0] if contains else start + 1
+            rows = list(await self.fetch(None, _bound(edge), limit, True))
+
+        reached = INF if forward else -INF
+        if len(rows) == limit:
+            # the last order may continue past the limit: cover up to the one before
+            last = rows[-1][1]
+            rows = [row for row in rows if row[1] != last]
+            reached = last - 1 if forward else last + 1
+            if not rows:  # a single order fills the batch
+                rows = list(await self.fetch(last - 1, last + 1, None, False))
+                reached = last
+
+        if forward:
+            self._cover(start, reached)
+        else:
+            self._cover(reached, start)
+        for key, order in rows:
+            if key not in self.seen:
+                self._insert(key, order)
+
+    def _cover(self, low: float, high: float):
+        merged = []
+        for lo, hi in self.covered:
+            if hi + 1 < low or high + 1 < lo:
+                merged.append([lo, hi])
+            else:
+                low, high = min(lo, low), max(hi, high)
+        merged.append([low, high])
+        self.covered = sorted(merged)
+
+    def _slot(self, key: LineKey) -> LineSlot:
+        if isinstance(key, int):
+            return (self.index[key], 0, key)
+        rank = self.temp_ids.setdefault(key, len(self.temp_ids))
+        return (self.index[key], 1, rank)
+
+    def _position(self, key: LineKey) -> int:
+        return bisect.bisect_left(self.slots, self._slot(key))
+
+    def _insert(self, key: LineKey, order: int):
+        self.index[key] = order
+        slot = self._slot(key)
+        i = bisect.bisect_left(self.slots, slot)
+        self.keys.insert(i, key)
+        self.slots.insert(i, slot)
+        self.seen.add(key)
+
+    def _remove(self, key: LineKey):
+        i = self._position(key)
+        del self.keys[i]
+        del self.slots[i]
+        del self.index[key]
+
+
+def _bound(edge: float) -> int | None:
+    return None if edge in (INF, -INF) else int(edge)
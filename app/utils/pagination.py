@@ -0,0 +1,44 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any
+
+from fastapi import HTTPException, status
+
+
+# Opaque cursor: urlsafe base64 of the sort key + id of the boundary row
+def encode_cursor(data: dict[str, Any]) -> str:
+    raw = json.dumps(data, default=_default, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict[str, Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        if not isinstance(data, dict):
+            raise ValueError(cursor)
+        return data
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+# Cursor fields of the expected types, otherwise the same 400 as an undecodable cursor
+# (a client can send any JSON object; bool is not accepted as int)
+def check_cursor_fields(data: dict[str, Any], **fields: type | tuple[type, ...]):
+    for name, kind in fields.items():
+        value = data.get(name)
+        if isinstance(value, bool) or not isinstance(value, kind):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            )
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
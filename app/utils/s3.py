@@ -1,9 +1,14 @@
-from app.core import s3_client, settings
+import time
+from collections import OrderedDict
 
+from app.core import get_s3_client, run_in_s3_pool, settings
 
-# expires in: 86400 (24h)
-def generate_presigned_url(object_key: str, expires_in: int = 86400) -> str:
-    return s3_client.generate_presigned_url(
+# (object key, expires in) -> (presigned url, monotonic time to re-sign)
+_presigned_urls: OrderedDict[tuple[str, int], tuple[str, float]] = OrderedDict()
+
+
+def _sign(object_key: str, expires_in: int) -> str:
+    return get_s3_client().generate_presigned_url(
         "get_object",
         Params={
             "Bucket": settings.s3_bucket,
@@ -11,3 +16,59 @@ def generate_presigned_url(object_key: str, expires_in: int = 86400) -> str:
         },
         ExpiresIn=expires_in,
     )
+
+
+def _cached(object_key: str, expires_in: int) -> str | None:
+    key = (object_key, expires_in)
+    cached = _presigned_urls.get(key)
+    if cached is None or cached[1] <= time.monotonic():
+        return None
+    _presigned_urls.move_to_end(key)
+    return cached[0]
+
+
+# reuse the url until refresh_ratio of its lifetime has passed, evict LRU
+def _remember(object_key: str, expires_in: int, url: str):
+    refresh_at = time.monotonic() + expires_in * settings.presign_refresh_ratio
+    _presigned_urls[(object_key, expires_in)] = (url, refresh_at)
+    _presigned_urls.move_to_end((object_key, expires_in))
+    while len(_presigned_urls) > settings.presign_cache_size:
+        _presigned_urls.popitem(last=False)
+
+
+# expires in: 86400 (24h)
+def generate_presigned_url(
+    object_key: str | None, expires_in: int = settings.presign_expires_in
+) -> str | None:
+    if not object_key:
+        return None
+
+    url = _cached(object_key, expires_in)
+    if url is None:
+        url = _sign(object_key, expires_in)
+        _remember(object_key, expires_in, url)
+    return url
+
+
+# Batched form: cache hits on the loop, misses signed together off the event loop
+async def generate_presigned_urls(
+    object_keys: list[str | None], expires_in: int = settings.presign_expires_in
+) -> dict[str, str]:
+    urls: dict[str, str] = {}
+    missing: list[str] = []
+    for object_key in dict.fromkeys(k for k in object_keys if k):
+        url = _cached(object_key, expires_in)
+        if url is None:
+            missing.append(object_key)
+        else:
+            urls[object_key] = url
+
+    if missing:
+        signed = await run_in_s3_pool(
+            lambda: [_sign(object_key, expires_in) for object_key in missing]
+        )
+        for object_key, url in zip(missing, signed):
+            _remember(object_key, expires_in, url)
+            urls[object_key] = url
+
+    return urls
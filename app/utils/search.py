@@ -0,0 +1,18 @@
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+NGRAM_TOKEN_SIZE = 2  # MySQL ngram_token_size (default)
+
+
+# FULLTEXT match on MySQL (index lookup), LIKE elsewhere
+# a query shorter than an ngram token is a prefix term: every token starting with it
+# (boolean operators cannot be escaped, such a short query is matched with LIKE)
+def text_matches(session: AsyncSession, column: InstrumentedAttribute, q: str):
+    if session.get_bind().dialect.name == "mysql":
+        if len(q) >= NGRAM_TOKEN_SIZE:
+            phrase = q.replace('"', " ")
+            return match(column, against=f'"{phrase}"').in_boolean_mode()
+        if q.isalnum():
+            return match(column, against=f"{q}*").in_boolean_mode()
+    return column.contains(q, autoescape=True)
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from sqlalchemy import Column, Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import Base
+
+
+# Table columns named like the response model's fields (selected instead of entities)
+def dto_columns(model: type[Base], dto: type[BaseModel]) -> list[Column]:
+    return [model.__table__.c[name] for name in dto.model_fields]
+
+
+# Rows as plain dicts: no ORM objects / identity map,
+# orjson encodes them as is (datetime, enum) without walking attributes
+async def fetch_dicts(session: AsyncSession, query: Select) -> list[dict]:
+    result = await session.execute(query)
+    keys = list(result.keys())
+    return [dict(zip(keys, row)) for row in result]
@@ -0,0 +1,30 @@
+import asyncio
+import tempfile
+from typing import AsyncIterable, AsyncIterator
+
+SPOOL_BYTES = 32 * 1024 * 1024  # export files above this are spooled to disk
+READ_BYTES = 1024 * 1024  # chunk size when sending a spooled file
+
+
+# Drain a cursor-backed stream into a temp file at database speed (file I/O off the loop):
+# the connection / server-side cursor is released before the first byte is sent, so a
+# slow client cannot hold it open past MySQL's net_write_timeout and cut the file
+async def spool(chunks: AsyncIterable[bytes]) -> tempfile.SpooledTemporaryFile:
+    file = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+    try:
+        async for chunk in chunks:
+            await asyncio.to_thread(file.write, chunk)
+        await asyncio.to_thread(file.seek, 0)
+    except BaseException:
+        file.close()
+        raise
+    return file
+
+
+# Send a spooled file at the client's pace, closed (deleted) afterwards
+async def iter_spooled(file: tempfile.SpooledTemporaryFile) -> AsyncIterator[bytes]:
+    try:
+        while data := await asyncio.to_thread(file.read, READ_BYTES):
+            yield data
+    finally:
+        file.close()
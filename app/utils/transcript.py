@@ -0,0 +1,219 @@
+import re
+import zipfile
+from datetime import datetime
+from typing import AsyncIterator, Literal
+
+from sqlalchemy import Row, Select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.utils.zip import ZipSink, entry_name
+
+TranscriptFormat = Literal["txt", "srt", "vtt"]
+ExportFormat = Literal["docx", "txt", "srt", "vtt"]
+
+MEDIA_TYPES = {
+    "txt": "text/plain; charset=utf-8",
+    "srt": "application/x-subrip; charset=utf-8",
+    "vtt": "text/vtt; charset=utf-8",
+}
+
+TRANSCRIPT_CHUNK = 1000  # rows per fetch of the export cursor
+LAST_CUE_SECONDS = 3.0  # duration of a cue without a following start time
+
+_BLANK_LINES = re.compile(r"\n\s*\n")  # a blank line ends a cue
+
+
+# "MM:SS", "HH:MM:SS" (fractions allowed) -> seconds, None when missing / invalid
+def _seconds(start_time: str | None) -> float | None:
+    if not start_time:
+        return None
+    seconds = 0.0
+    try:
+        for part in start_time.strip().split(":"):
+            seconds = seconds * 60 + float(part)
+    except ValueError:
+        return None
+    return seconds
+
+
+def _timestamp(seconds: float, separator: str) -> str:
+    ms = round(seconds * 1000)
+    h, ms = divmod(ms, 3_600_000)
+    m, ms = divmod(ms, 60_000)
+    s, ms = divmod(ms, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d}{separator}{ms:03d}"
+
+
+# Plain text, same layout as the docx: heading, then "speaker<TAB>time<TAB>text"
+class TextTranscript:
+    header = ""
+    separator = "\n"  # between merged documents (the docx's blank paragraph)
+
+    def begin(self, row: Row) -> str:
+        dt = datetime.strptime(
+            f"{row.recorded_date}{row.recorded_time}", "%y%m%d%H%M%S"
+        )
+        return dt.strftime("%y.%m.%d_%H:%M:%S") + "\n"
+
+    def line(self, row: Row) -> str:
+        return f"{row.name or 'Unknown'}\t{row.start_time or ''}\t{row.text}\n"
+
+    def end(self) -> str:
+        return ""
+
+
+# Cues end at the next line's start, so each cue is written one line late
+# lines without a start time keep the previous line's time (shown for at most
+# LAST_CUE_SECONDS), lines without text are skipped (a cue needs a text line)
+class SubtitleTranscript:
+    header = ""
+    separator = ""
+    timestamp_separator = ","
+    cues = 0  # numbered across the whole file
+
+    def begin(self, row: Row) -> str:
+        # (start, inherited start, speaker, text)
+        self._pending: tuple[float, bool, str | None, str] | None = None
+        self._last_start = 0.0
+        return ""
+
+    def line(self, row: Row) -> str:
+        start = _seconds(row.start_time)
+        inherited = start is None
+        if inherited:
+            start = self._last_start
+        self._last_start = start
+
+        text = _BLANK_LINES.sub("\n", (row.text or "").strip())
+        if not text:
+            return ""
+        cue = self._flush(start)
+        self._pending = (start, inherited, row.name, text)
+        return cue
+
+    def end(self) -> str:
+        return self._flush(None)
+
+    def _flush(self, next_start: float | None) -> str:
+        if self._pending is None:
+            return ""
+        start, inherited, speaker, text = self._pending
+        self._pending = None
+        if next_start is None or next_start <= start:
+            end = start + LAST_CUE_SECONDS
+        elif inherited:
+            end = min(next_start, start + LAST_CUE_SECONDS)
+        else:
+            end = next_start
+        self.cues += 1
+        timing = (
+            f"{_timestamp(start, self.timestamp_separator)} --> "
+            f"{_timestamp(end, self.timestamp_separator)}"
+        )
+        return self.cue(timing, speaker, text)
+
+    def cue(self, timing: str, speaker: str | None, text: str) -> str:
+        raise NotImplementedError
+
+
+class SrtTranscript(SubtitleTranscript):
+    def cue(self, timing: str, speaker: str | None, text: str) -> str:
+        if speaker:
+            text = f"{speaker}: {text}"
+        return f"{self.cues}\n{timing}\n{text}\n\n"
+
+
+# WebVTT: the speaker is a voice span, cue text is escaped (no "-->" / tags)
+class VttTranscript(SubtitleTranscript):
+    header = "WEBVTT\n\n"
+    timestamp_separator = "."
+
+    def cue(self, timing: str, speaker: str | None, text: str) -> str:
+        text = _vtt_escape(text)
+        if speaker:
+            text = f"<v {_vtt_escape(speaker)}>{text}"
+        return f"{timing}\n{text}\n\n"
+
+
+def _vtt_escape(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+TRANSCRIPTS = {
+    "txt": TextTranscript,
+    "srt": SrtTranscript,
+    "vtt": VttTranscript,
+}
+
+
+async def _partitions(query: Select, bind: AsyncEngine) -> AsyncIterator[list[Row]]:
+    async with AsyncSession(bind) as session:
+        result = await session.stream(
+            query.execution_options(yield_per=TRANSCRIPT_CHUNK)
+        )
+        async for rows in result.partitions():
+            yield rows
+
+
+# One file with every document of the export rows (export_rows_query)
+# text is produced row by row from the cursor, no document is held in memory
+async def stream_transcript(
+    query: Select, bind: AsyncEngine, format: TranscriptFormat
+) -> AsyncIterator[bytes]:
+    transcript = TRANSCRIPTS[format]()
+    current = None
+    yield transcript.header.encode()
+    async for rows in _partitions(query, bind):
+        parts = []
+        for row in rows:
+            if row.id != current:
+                if current is not None:
+                    parts.append(transcript.end() + transcript.separator)
+                parts.append(transcript.begin(row))
+                current = row.id
+            if row.line_id is not None:
+                parts.append(transcript.line(row))
+        yield "".join(parts).encode()
+    if current is not None:
+        yield transcript.end().encode()
+
+
+# Zip with one "{title}.{format}" entry per document, entries are compressed and
+# sent while the cursor is read
+async def stream_transcript_zip(
+    query: Select, bind: AsyncEngine, format: TranscriptFormat
+) -> AsyncIterator[bytes]:
+    sink = ZipSink()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        entry = transcript = None
+        current = None
+        names: set[str] = set()
+        try:
+            async for rows in _partitions(query, bind):
+                parts = []
+                for row in rows:
+                    if row.id != current:
+                        if entry is not None:
+                            parts.append(transcript.end())
+                            entry.write("".join(parts).encode())
+                            entry.close()
+                            parts = []
+                        transcript = TRANSCRIPTS[format]()
+                        title = row.title.replace(".txt", "")
+                        name = entry_name(title, row.id, format, names)
+                        entry = zip_file.open(name, "w", force_zip64=True)
+                        parts.append(transcript.header + transcript.begin(row))
+                        current = row.id
+                    if row.line_id is not None:
+                        parts.append(transcript.line(row))
+                if entry is not None:
+                    entry.write("".join(parts).encode())
+                yield sink.drain()
+
+            if entry is not None:
+                entry.write(transcript.end().encode())
+        finally:
+            # an open entry makes ZipFile.close() raise, hiding the error / cancellation
+            if entry is not None:
+                entry.close()
+    yield sink.drain()  # central directory
@@ -1,13 +1,50 @@
-import io
 import zipfile
+from typing import AsyncIterable, AsyncIterator
 
 
-def make_zip(files: list[tuple[str, io.BytesIO]]) -> io.BytesIO:
-    zip_buffer = io.BytesIO()  # make empty buffer to save the zip file
-    # create a zip file in the buffer
-    with zipfile.ZipFile(zip_buffer, "w") as zip_file:
-        for filename, buffer in files:
-            zip_file.writestr(filename, buffer.read())  # add the files to the zip file
+# Write-only file object for ZipFile, keeps written bytes until drained
+# (no seek/tell -> zipfile writes data descriptors, so nothing is rewritten later)
+class ZipSink:
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self.buffered = 0  # bytes written since the last drain
 
-    zip_buffer.seek(0)  # set the pointer to the beginning of the buffer
-    return zip_buffer
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self.buffered += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self.buffered = 0
+        return data
+
+
+# "{title}.{extension}", flat (no directories) and unique within the zip
+# a repeated title gets the key of its entry: "{title} ({key}).{extension}"
+def entry_name(title: str, key: int, extension: str, names: set[str]) -> str:
+    title = title.replace("/", "_").replace("\\", "_")
+    name = f"{title}.{extension}"
+    if name in names:
+        name = f"{title} ({key}).{extension}"
+    names.add(name)
+    return name
+
+
+# Stream a zip file of (key, title, data) entries named by entry_name
+# each entry is sent as soon as it is ready
+async def stream_zip(
+    files: AsyncIterable[tuple[int, str, bytes]], extension: str
+) -> AsyncIterator[bytes]:
+    sink = ZipSink()
+    names: set[str] = set()
+    with zipfile.ZipFile(sink, "w") as zip_file:
+        async for key, title, data in files:
+            filename = entry_name(title, key, extension, names)
+            zip_file.writestr(filename, data)  # add the file to the zip file
+            yield sink.drain()
+    yield sink.drain()  # central directory
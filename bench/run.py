@@ -0,0 +1,332 @@
+# Benchmark suite: seeds a synthetic dataset into a local database stand-in
+# and measures the main API paths in-process (httpx ASGI transport)
+#
+#   uv run --group bench python -m bench.run --documents 20 --max-lines 20000
+#   uv run --group bench python -m bench.run --compare bench_results.json
+#
+# Default stand-in is SQLite (aiosqlite) in a temp directory; point DB_URL at a
+# local MySQL container to measure against MySQL. S3 is only used for presigning
+# on these paths, which needs no server: dummy credentials + local endpoint
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable
+
+SCENARIOS = [
+    "get_document",
+    "get_documents",
+    "get_documents_cursor",
+    "sync_small",
+    "sync_large",
+    "download_single",
+    "download_single_cached",
+    "download_zip",
+    "merged_export",
+]
+
+
+def _configure(args: argparse.Namespace):
+    database = args.database or Path(tempfile.mkdtemp(prefix="bench-")) / "bench.db"
+    if not args.database and Path(database).exists():
+        Path(database).unlink()
+    os.environ.setdefault("DB_URL", f"sqlite+aiosqlite:///{database}")
+    os.environ.setdefault("DB_HOST", "unused")
+    os.environ.setdefault("S3_ENDPOINT", "http://127.0.0.1:9000")
+    os.environ.setdefault("S3_ACCESS_KEY", "bench")
+    os.environ.setdefault("S3_SECRET_KEY", "bench")
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(q * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+# an error response, counted by measure() (anything else aborts the run)
+class RequestFailed(Exception):
+    pass
+
+
+@dataclass
+class Scenario:
+    request: Callable[[], Awaitable[None]]
+    before_each: Callable[[], Awaitable[None]] | None = None
+    concurrency: int | None = None  # fixed concurrency (e.g. autosaves of one document)
+
+
+async def measure(scenario: Scenario, iterations: int, concurrency: int) -> dict:
+    concurrency = scenario.concurrency or concurrency
+    latencies: list[float] = []
+    errors = 0
+    remaining = iterations
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            if scenario.before_each:
+                await scenario.before_each()
+            start = time.perf_counter()
+            try:
+                await scenario.request()
+            except RequestFailed as e:
+                errors += 1
+                print(f"  error: {e!r}", file=sys.stderr)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "iterations": iterations,
+        "concurrency": concurrency,
+        "errors": errors,
+        "throughput_rps": iterations / elapsed,
+        "mean_ms": sum(latencies) / len(latencies) * 1000,
+        "p50_ms": _percentile(latencies, 0.50) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+        "min_ms": min(latencies) * 1000,
+        "max_ms": max(latencies) * 1000,
+    }
+
+
+def build_scenarios(client, seeded, line_ids: list[int]) -> dict[str, Scenario]:
+    from app.utils import render_cache
+
+    largest = seeded.largest_document_id
+    category_id = seeded.category_ids[0]
+    documents = seeded.document_ids[category_id]
+    pages = max(1, len(documents) // 5)
+    counter = {"page": 0}
+    created: list[int] = []  # lines created by the previous sync, deleted by the next
+
+    async def ok(response):
+        if response.status_code >= 400:
+            raise RequestFailed(f"{response.status_code} {response.text[:200]}")
+        await response.aread()
+
+    async def get_document():
+        await ok(await client.get(f"/api/v1/documents/{largest}"))
+
+    async def get_documents():
+        counter["page"] = counter["page"] % pages + 1
+        await ok(
+            await client.get(
+                "/api/v1/documents",
+                params={"category_id": category_id, "size": 5, "page": counter["page"]},
+            )
+        )
+
+    async def get_documents_cursor():
+        await ok(
+            await client.get(
+                "/api/v1/documents",
+                params={
+                    "category_id": category_id,
+                    "size": 5,
+                    "sort_by": "updated_at",
+                    "order": "desc",
+                    "pagination": "cursor",
+                },
+            )
+        )
+
+    async def sync(size: int):
+        diff = {
+            "created": [
+                {
+                    "temp_id": f"t{i}",
+                    "speaker_id": str(seeded.first_speaker_id),
+                    "text": f"bench line {i}",
+                    "order": 10_000_000 + i,
+                }
+                for i in range(size)
+            ],
+            "updated": [
+                {"id": line_id, "text": f"bench update {time.time_ns()}"}
+                for line_id in line_ids[:size]
+            ],
+            "deleted": created[:],
+            "orders": [
+                {"id": line_id, "order": order}
+                for order, line_id in enumerate(line_ids[:size])
+            ],
+        }
+        response = await client.patch(
+            f"/api/v1/documents/{largest}/script_lines", json=diff
+        )
+        await ok(response)
+        created[:] = [line_id for _, line_id in response.json()["data"]["lines"]]
+
+    async def sync_small():
+        await sync(1)
+
+    async def sync_large():
+        await sync(300)
+
+    async def download_single():
+        await ok(await client.post("/api/v1/documents/download", json=[largest]))
+
+    async def download_zip():
+        await ok(await client.post("/api/v1/documents/download", json=documents[:10]))
+
+    async def merged_export():
+        await ok(await client.post("/api/v1/categories/download", json=[category_id]))
+
+    return {
+        "get_document": Scenario(get_document),
+        "get_documents": Scenario(get_documents),
+        "get_documents_cursor": Scenario(get_documents_cursor),
+        "sync_small": Scenario(sync_small, concurrency=1),
+        "sync_large": Scenario(sync_large, concurrency=1),
+        "download_single": Scenario(download_single, before_each=render_cache.clear),
+        "download_single_cached": Scenario(download_single),
+        "download_zip": Scenario(download_zip, before_each=render_cache.clear),
+        "merged_export": Scenario(merged_export),
+    }
+
+
+def compare(previous: dict, current: dict):
+    print(f"\n{'scenario':<24}{'p50 ms':>22}{'p99 ms':>22}{'rps':>20}")
+    for name, result in current["results"].items():
+        before = previous.get("results", {}).get(name)
+        if not before:
+            continue
+
+        def cell(key: str, before: dict = before, result: dict = result) -> str:
+            old, new = before[key], result[key]
+            change = (new - old) / old * 100 if old else 0.0
+            return f"{old:.1f}->{new:.1f} ({change:+.0f}%)"
+
+        print(
+            f"{name:<24}{cell('p50_ms'):>22}{cell('p99_ms'):>22}"
+            f"{cell('throughput_rps'):>20}"
+        )
+
+
+async def main(args: argparse.Namespace) -> dict:
+    import httpx
+    from sqlalchemy import select
+
+    from app.core import async_session, init_db, render_executor
+    from app.main import app
+    from app.models import ScriptLine, Speaker
+    from bench.seed import Dataset, seed
+
+    await init_db()
+    dataset = Dataset(
+        categories=args.categories,
+        documents=args.documents,
+        max_lines=args.max_lines,
+        speakers=args.speakers,
+        seed=args.seed,
+    )
+    start = time.perf_counter()
+    async with async_session() as session:
+        seeded = await seed(session, dataset)
+        seeded.first_speaker_id = await session.scalar(
+            select(Speaker.id).where(Speaker.document_id == seeded.largest_document_id)
+        )
+        result = await session.execute(
+            select(ScriptLine.id)
+            .where(ScriptLine.document_id == seeded.largest_document_id)
+            .order_by(ScriptLine.order)
+            .limit(300)
+        )
+        line_ids = list(result.scalars())
+    print(f"seeded {seeded.lines} lines in {time.perf_counter() - start:.1f}s")
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=None
+    ) as client:
+        scenarios = build_scenarios(client, seeded, line_ids)
+        for name in args.scenarios:
+            scenario = scenarios[name]
+            await measure(scenario, args.warmup, 1)  # warm pools and process workers
+            results[name] = await measure(scenario, args.iterations, args.concurrency)
+            r = results[name]
+            print(
+                f"{name:<24} p50 {r['p50_ms']:9.1f} ms  p99 {r['p99_ms']:9.1f} ms"
+                f"  {r['throughput_rps']:8.1f} req/s  errors {r['errors']}"
+            )
+
+    render_executor.shutdown()
+
+    commit = await _git_commit()
+
+    return {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "git_commit": commit,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": os.environ["DB_URL"].split("://", 1)[0],
+            "dataset": seeded.summary(),
+            "iterations": args.iterations,
+            "concurrency": args.concurrency,
+        },
+        "results": results,
+    }
+
+
+async def _git_commit() -> str | None:
+    try:
+        process = await asyncio.create_subprocess_exec(
+            "git",
+            "rev-parse",
+            "HEAD",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+    except OSError:
+        return None
+    stdout, _ = await process.communicate()
+    return stdout.decode().strip() if process.returncode == 0 else None
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Editor server benchmarks")
+    parser.add_argument("--categories", type=int, default=2)
+    parser.add_argument("--documents", type=int, default=10, help="per category")
+    parser.add_argument("--max-lines", type=int, default=5000)
+    parser.add_argument("--speakers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--scenarios",
+        type=lambda value: value.split(","),
+        default=SCENARIOS,
+        help=f"comma separated subset of {','.join(SCENARIOS)}",
+    )
+    parser.add_argument("--database", type=Path, help="sqlite file (default: temp)")
+    parser.add_argument("--output", type=Path, default=Path("bench_results.json"))
+    parser.add_argument("--compare", type=Path, help="previous results to diff against")
+    args = parser.parse_args(argv)
+
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    _configure(args)
+    report = asyncio.run(main(args))
+    args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"results written to {args.output}")
+    if args.compare:
+        compare(json.loads(args.compare.read_text()), report)
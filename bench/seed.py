@@ -0,0 +1,132 @@
+import random
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+
+from sqlalchemy import BigInteger, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+
+from app.models import Category, Document, DocumentStatus, ScriptLine, Speaker
+
+SYLLABLES = (
+    "가나다라마바사아자차카타파하고노도로모보소오조초코토포호구누두루무부수우주추"
+)
+STATUSES = list(DocumentStatus)
+CHUNK_SIZE = 5000
+
+
+# SQLite only auto-increments "INTEGER PRIMARY KEY" (not BIGINT)
+@compiles(BigInteger, "sqlite")
+def _compile_big_integer(type_, compiler, **kw):
+    return "INTEGER"
+
+
+@dataclass
+class Dataset:
+    categories: int = 2
+    documents: int = 10  # per category
+    max_lines: int = 5000  # the first document of each category has exactly this many
+    speakers: int = 4  # per document
+    seed: int = 42
+
+
+@dataclass
+class Seeded:
+    dataset: Dataset
+    category_ids: list[int] = field(default_factory=list)
+    document_ids: dict[int, list[int]] = field(default_factory=dict)  # category -> ids
+    largest_document_id: int = 0
+    first_speaker_id: int = 0
+    lines: int = 0
+
+    def summary(self) -> dict:
+        return {**asdict(self.dataset), "total_lines": self.lines}
+
+
+def _sentence(rng: random.Random) -> str:
+    words = (
+        "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 4)))
+        for _ in range(rng.randint(3, 15))
+    )
+    return " ".join(words) + rng.choice(".?!")
+
+
+# Deterministic synthetic transcripts (same dataset + seed -> same rows)
+async def seed(session: AsyncSession, dataset: Dataset) -> Seeded:
+    rng = random.Random(dataset.seed)
+    seeded = Seeded(dataset)
+    base_date = datetime(2024, 1, 1)
+    document_id = speaker_id = line_id = 0
+    lines: list[dict] = []
+
+    async def flush_lines():
+        if lines:
+            await session.execute(insert(ScriptLine.__table__), lines)
+            lines.clear()
+
+    for category_id in range(1, dataset.categories + 1):
+        await session.execute(
+            insert(Category.__table__),
+            [{"id": category_id, "name": f"Category {category_id}"}],
+        )
+        seeded.category_ids.append(category_id)
+        seeded.document_ids[category_id] = []
+
+        for n in range(dataset.documents):
+            document_id += 1
+            recorded = base_date + timedelta(minutes=rng.randint(0, 525600))
+            await session.execute(
+                insert(Document.__table__),
+                [
+                    {
+                        "id": document_id,
+                        "category_id": category_id,
+                        "title": f"{category_id:02d}_{n:04d}.txt",
+                        "audio_url": f"audio/{document_id}.m4a",
+                        "file_size": rng.randint(100_000, 200_000_000),
+                        "status": rng.choice(STATUSES),
+                        "recorded_date": recorded.strftime("%y%m%d"),
+                        "recorded_time": recorded.strftime("%H%M%S"),
+                    }
+                ],
+            )
+            seeded.document_ids[category_id].append(document_id)
+
+            speaker_ids = list(range(speaker_id + 1, speaker_id + dataset.speakers + 1))
+            speaker_id += dataset.speakers
+            await session.execute(
+                insert(Speaker.__table__),
+                [
+                    {"id": sid, "document_id": document_id, "name": f"화자{i + 1}"}
+                    for i, sid in enumerate(speaker_ids)
+                ],
+            )
+
+            line_count = (
+                dataset.max_lines
+                if n == 0
+                else rng.randint(dataset.max_lines // 10, dataset.max_lines)
+            )
+            if n == 0 and category_id == 1:
+                seeded.largest_document_id = document_id
+            seconds = 0
+            for order in range(line_count):
+                line_id += 1
+                seconds += rng.randint(1, 15)
+                lines.append(
+                    {
+                        "id": line_id,
+                        "document_id": document_id,
+                        "speaker_id": rng.choice(speaker_ids),
+                        "text": _sentence(rng),
+                        "start_time": f"{seconds // 60:02d}:{seconds % 60:02d}",
+                        "order": order,
+                    }
+                )
+                if len(lines) >= CHUNK_SIZE:
+                    await flush_lines()
+            seeded.lines += line_count
+
+    await flush_lines()
+    await session.commit()
+    return seeded
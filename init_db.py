@@ -0,0 +1,13 @@
+import asyncio
+
+from app.core import engine, init_db
+
+
+# Create the tables (opt-in, the server does not touch the schema on boot)
+async def main():
+    print(await init_db())
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
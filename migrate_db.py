@@ -0,0 +1,15 @@
+import asyncio
+
+from app.core import engine, migrate_db
+
+
+# Add columns / indexes introduced since the tables were created (opt-in, idempotent)
+# large tables: index builds take a while, run it outside peak hours
+async def main():
+    applied = await migrate_db()
+    print("\n".join(applied) or "Database is up to date")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
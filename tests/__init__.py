@@ -0,0 +1,7 @@
+# app settings need these at import time, nothing is connected to
+import os
+
+os.environ.setdefault("DB_HOST", "unused")
+os.environ.setdefault("S3_ENDPOINT", "http://127.0.0.1:9000")
+os.environ.setdefault("S3_ACCESS_KEY", "test")
+os.environ.setdefault("S3_SECRET_KEY", "test")
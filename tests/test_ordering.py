@@ -0,0 +1,146 @@
+# LineOrder against an in-memory table (fake fetch with the service's semantics)
+#
+#   python -m unittest   (or: python -m pytest tests)
+import random
+import unittest
+
+from app.utils.ordering import ORDER_GAP, LineOrder
+
+
+class Table:
+    def __init__(self, rows: dict[int, int]):
+        self.rows = dict(rows)  # id -> order
+        self.fetched = 0  # rows returned, to check only neighbours are read
+
+    # rows with low < order < high, (order, id) order like the index scan
+    async def fetch(self, low, high, limit, descending):
+        rows = sorted(
+            (
+                (order, line_id)
+                for line_id, order in self.rows.items()
+                if (low is None or order > low) and (high is None or order < high)
+            ),
+            reverse=descending,
+        )[:limit]
+        self.fetched += len(rows)
+        return [(line_id, order) for order, line_id in rows]
+
+    def layout(self, *referenced: int) -> LineOrder:
+        return LineOrder(
+            [(key, self.rows[key]) for key in referenced if key in self.rows],
+            self.fetch,
+        )
+
+    # lines as a reader sees them after the changes: (order, id), created lines
+    # get the next ids in creation order
+    def visible(self, layout: LineOrder, created: list[str] = ()) -> list:
+        orders = {**self.rows, **layout.changed}
+        next_id = max(self.rows, default=0) + 1
+        ids = {temp_id: next_id + i for i, temp_id in enumerate(created)}
+        return sorted(orders, key=lambda key: (orders[key], ids.get(key, key)))
+
+
+class Ordered:
+    # expected sequence, plain list semantics
+    def __init__(self, keys):
+        self.keys = list(keys)
+
+    def place(self, key, after):
+        if key in self.keys:
+            self.keys.remove(key)
+        self.keys.insert(0 if after is None else self.keys.index(after) + 1, key)
+
+
+class LineOrderTest(unittest.IsolatedAsyncioTestCase):
+    async def place_all(self, table, placements, created=()):
+        layout = table.layout(*{k for p in placements for k in p if isinstance(k, int)})
+        expected = Ordered(sorted(table.rows, key=lambda k: (table.rows[k], k)))
+        for key, after in placements:
+            await layout.place(key, after)
+            expected.place(key, after)
+        self.assertEqual(table.visible(layout, list(created)), expected.keys)
+        orders = {**table.rows, **layout.changed}
+        return layout, orders
+
+    async def test_empty_document(self):
+        table = Table({})
+        layout, orders = await self.place_all(table, [("a", None), ("b", "a")], "ab")
+        self.assertEqual(layout.changed, {"a": ORDER_GAP, "b": 2 * ORDER_GAP})
+
+    async def test_gapped_midpoint_touches_one_row(self):
+        table = Table({i: i * ORDER_GAP for i in range(1, 101)})
+        layout, _ = await self.place_all(table, [("t", 50), (10, 70)], "t")
+        self.assertEqual(set(layout.changed), {"t", 10})
+
+    async def test_dense_inserts_near_either_end_stay_local(self):
+        for after in (3, 497):
+            table = Table({i: i for i in range(1, 501)})
+            layout, _ = await self.place_all(table, [("t", after)], "t")
+            self.assertLess(len(layout.changed), 10)
+
+    async def test_dense_middle(self):
+        table = Table({i: i for i in range(1, 201)})
+        layout, orders = await self.place_all(table, [("t", 100), ("u", "t")], "tu")
+        self.assertEqual(len(set(orders.values())), len(orders))
+
+    async def test_both_ends(self):
+        table = Table({i: i for i in range(1, 21)})
+        await self.place_all(
+            table,
+            [("first", None), ("last", 20), (5, None), (6, "last")],
+            ["first", "last"],
+        )
+
+    async def test_equal_orders_keep_untouched_lines(self):
+        table = Table({1: 0, 2: 0, 3: 0})
+        layout, _ = await self.place_all(table, [("t", 2)], "t")
+        self.assertNotIn(1, layout.changed)
+
+    async def test_equal_orders_move(self):
+        table = Table({1: 5, 2: 5, 3: 5, 4: 5, 5: 9})
+        await self.place_all(table, [(1, 3), (5, None), (2, 4)])
+
+    async def test_reads_only_neighbours(self):
+        table = Table({i: i * ORDER_GAP for i in range(1, 10001)})
+        await self.place_all(table, [("t", 5000), (9000, 20)], "t")
+        self.assertLess(table.fetched, 300)
+
+    async def test_absolute_orders_mix(self):
+        table = Table({i: i * ORDER_GAP for i in range(1, 11)})
+        layout = table.layout(3)
+        layout.assign(7, ORDER_GAP // 2)  # legacy `orders`: line 7 first
+        await layout.place("t", 7)
+        self.assertEqual(table.visible(layout, ["t"])[:3], [7, "t", 1])
+
+    async def test_random(self):
+        rnd = random.Random(7)
+        for _ in range(1500):
+            n = rnd.choice([0, 1, 2, 5, 40, 150])
+            kind = rnd.choice(["dense", "gapped", "duplicates"])
+            if kind == "dense":
+                rows = {i: i for i in range(1, n + 1)}
+            elif kind == "gapped":
+                rows = {i: i * rnd.choice([2, 3, ORDER_GAP]) for i in range(1, n + 1)}
+            else:
+                rows = {i: rnd.randint(0, max(n // 4, 1)) for i in range(1, n + 1)}
+            table = Table(rows)
+
+            keys = sorted(rows, key=lambda k: (rows[k], k))
+            placements, created = [], []
+            for _ in range(rnd.randint(1, 6)):
+                if keys and rnd.random() < 0.5:
+                    key = rnd.choice(keys)
+                else:
+                    key = f"t{len(created)}"
+                    created.append(key)
+                others = [k for k in keys if k != key]
+                after = rnd.choice(others) if others and rnd.random() < 0.85 else None
+                placements.append((key, after))
+                if key not in keys:
+                    keys.append(key)
+            with self.subTest(rows=rows, placements=placements):
+                await self.place_all(table, placements, created)
+
+
+if __name__ == "__main__":
+    unittest.main()